@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+JSON input/output shared by the ML engine CLIs
+Uses orjson when installed and falls back to the stdlib json module
+"""
+
+import json
+import sys
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    loads = orjson.loads
+
+    def dumpb(obj, default=None):
+        """obj as one line of UTF-8 JSON bytes"""
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            # Values orjson rejects (e.g. integers beyond 64 bits) go through stdlib json
+            return (json.dumps(obj, default=default) + "\n").encode()
+else:
+    loads = json.loads
+
+    def dumpb(obj, default=None):
+        """obj as one line of UTF-8 JSON bytes"""
+        return (json.dumps(obj, default=default) + "\n").encode()
+
+
+def emit(obj, default=None):
+    """Write obj to stdout as one line of UTF-8 JSON"""
+    sys.stdout.buffer.write(dumpb(obj, default))
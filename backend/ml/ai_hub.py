@@ -7,79 +7,454 @@ Unified interface for all ML/AI engines
 import json
 import sys
 import os
+import time
 import importlib.util
+from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
+from traceback import format_exc
+
+from _jsonio import loads as _loads, dumpb, emit
 
 # Get the directory where this script is located
 SCRIPT_DIR = Path(__file__).parent.absolute()
 
+# ==========================================
+# JSON HELPERS
+# ==========================================
+
+def _json_default(obj):
+    # Read-only views such as CAPABILITIES serialize as plain objects
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumpb(obj):
+    return dumpb(obj, _json_default)
+
+
+def _emit(obj):
+    """Write obj to stdout as one line of UTF-8 JSON, skipping the str round-trip of print()"""
+    emit(obj, _json_default)
+
 # ==========================================
 # ENGINE LOADER
 # ==========================================
 
+ENGINE_FILES = {
+    'analysis': 'analysis.py',
+    'analytics': 'analytics_engine.py',
+    'image': 'image_processor.py',
+    'fraud': 'fraud_detector.py',
+    'email': 'email_templates.py',
+    'search': 'search_engine.py',
+    'recommend': 'recommendation_engine.py',
+    'price': 'price_optimizer.py',
+    'payment': 'payment_verifier.py',
+    'health': 'health_monitor.py',
+    # New Advanced Engines
+    'neural': 'neural_commerce.py',
+    'emotion': 'emotion_ai.py',
+    'performance': 'performance_optimizer.py',
+    'errors': 'error_tracker.py',
+    'ml': 'ml_engine.py',
+    'security': 'security_manager.py',
+    'realtime': 'realtime_manager.py',
+    'seo': 'seo_engine.py',
+    'sales': 'sales_insights.py'
+}
+ENGINE_PATHS = {name: SCRIPT_DIR / file for name, file in ENGINE_FILES.items()}
+
+# Seconds a get_available_engines() result is reused before the directory is listed again
+AVAILABLE_ENGINES_TTL = 1.0
+
+
+class LazyModule:
+    """Proxy that defers executing an engine file until one of its attributes is used"""
+    
+    def __init__(self, module_name, file_path):
+        self._module_name = module_name
+        self._file_path = file_path
+        self._module = None
+    
+    def _load(self):
+        module = sys.modules.get(self._module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(self._module_name, self._file_path)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Cannot load engine from {self._file_path}")
+            
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            sys.modules[self._module_name] = module
+        
+        self._module = module
+        return module
+    
+    def __getattr__(self, name):
+        module = self._module or self._load()
+        return getattr(module, name)
+
+
 class EngineLoader:
+    # (timestamp, result) of the last get_available_engines() scan, shared by all loaders
+    _available_cache = None
+    
     def __init__(self):
         self.engines = {}
-        self.engine_files = {
-            'analysis': 'analysis.py',
-            'analytics': 'analytics_engine.py',
-            'image': 'image_processor.py',
-            'fraud': 'fraud_detector.py',
-            'email': 'email_templates.py',
-            'search': 'search_engine.py',
-            'recommend': 'recommendation_engine.py',
-            'price': 'price_optimizer.py',
-            'payment': 'payment_verifier.py',
-            'health': 'health_monitor.py',
-            # New Advanced Engines
-            'neural': 'neural_commerce.py',
-            'emotion': 'emotion_ai.py',
-            'performance': 'performance_optimizer.py',
-            'errors': 'error_tracker.py',
-            'ml': 'ml_engine.py',
-            'security': 'security_manager.py',
-            'realtime': 'realtime_manager.py',
-            'seo': 'seo_engine.py',
-            'sales': 'sales_insights.py'
-        }
+        self.engine_files = ENGINE_FILES
+        self.engine_paths = ENGINE_PATHS
     
     def load_engine(self, engine_name):
-        """Dynamically load an engine module"""
+        """Get an engine module, deferring its execution until first use"""
         if engine_name in self.engines:
             return self.engines[engine_name]
         
-        if engine_name not in self.engine_files:
+        file_path = self.engine_paths.get(engine_name)
+        if file_path is None:
             return None
         
-        file_path = SCRIPT_DIR / self.engine_files[engine_name]
-        
-        if not file_path.exists():
-            return None
-        
-        spec = importlib.util.spec_from_file_location(engine_name, file_path)
-        if spec is None or spec.loader is None:
-            return None
-            
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        # Reuse a module already executed by another loader in this process
+        module_name = f"blackonn_engine_{engine_name}"
+        module = sys.modules.get(module_name)
+        if module is None:
+            if not file_path.exists():
+                return None
+            module = LazyModule(module_name, file_path)
         
         self.engines[engine_name] = module
         return module
     
-    def get_available_engines(self):
+    @classmethod
+    def get_available_engines(cls):
         """Get list of available engines"""
+        now = time.monotonic()
+        if cls._available_cache is not None and now - cls._available_cache[0] < AVAILABLE_ENGINES_TTL:
+            return cls._available_cache[1]
+        
+        # One directory listing instead of a stat per engine file
+        with os.scandir(SCRIPT_DIR) as entries:
+            present = {entry.name for entry in entries if entry.is_file()}
+        
         available = []
-        for name, file in self.engine_files.items():
-            path = SCRIPT_DIR / file
+        for name, file in ENGINE_FILES.items():
             available.append({
                 "name": name,
                 "file": file,
-                "exists": path.exists(),
-                "path": str(path)
+                "exists": file in present,
+                "path": str(ENGINE_PATHS[name])
             })
+        
+        cls._available_cache = (now, available)
         return available
 
 
+# ==========================================
+# ROUTING TABLE
+# ==========================================
+
+# engine -> (class to instantiate, or None for function-based modules, unavailable message)
+ENGINE_TARGETS = {
+    'recommend': ('RecommendationEngine', "Recommendation engine not available"),
+    'neural': ('NeuralCommerceEngine', "Neural commerce engine not available"),
+    'fraud': ('FraudDetector', "Fraud detection engine not available"),
+    'analytics': (None, "Analytics engine not available"),
+    'email': (None, "Email template engine not available"),
+    'search': ('SearchEngine', "Search engine not available"),
+    'price': ('PriceOptimizer', "Price optimizer not available"),
+    'image': (None, "Image processor not available"),
+    'payment': ('PaymentVerificationAI', "Payment verification engine not available"),
+    'health': ('HealthMonitorOrchestrator', "Health monitor engine not available"),
+    'analysis': (None, "Analysis engine not available"),
+    'emotion': ('EmotionAIEngine', "Emotion AI engine not available"),
+    'performance': ('PerformanceOptimizer', "Performance optimizer engine not available"),
+    'errors': ('ErrorTrackerEngine', "Error tracker engine not available"),
+    'ml': ('MLEngine', "ML engine not available"),
+    'security': ('SecurityManager', "Security manager engine not available"),
+    'realtime': ('RealTimeManager', "Real-time manager engine not available"),
+    'seo': ('AISEOEngine', "SEO engine not available"),
+    'sales': ('SalesInsightsEngine', "Sales insights engine not available")
+}
+
+# Static capability listing, shared read-only across calls
+_CAPABILITIES = {
+    "analytics": {
+        "tasks": ("rfm", "cohort", "forecast", "product-performance", "ab-test"),
+        "description": "Customer and sales analytics"
+    },
+    "fraud": {
+        "tasks": ("analyze", "batch", "stats"),
+        "description": "Transaction fraud detection"
+    },
+    "email": {
+        "tasks": ("welcome", "order_confirmation", "shipping", "password_reset", "abandoned_cart", "review_request"),
+        "description": "Email template generation"
+    },
+    "search": {
+        "tasks": ("search", "autocomplete", "index", "trending"),
+        "description": "Full-text search with fuzzy matching"
+    },
+    "recommend": {
+        "tasks": ("similar", "collaborative", "trending", "together", "personalized"),
+        "description": "Product recommendations"
+    },
+    "price": {
+        "tasks": ("optimize", "bundle", "clearance", "seasonal", "margin"),
+        "description": "Dynamic pricing optimization"
+    },
+    "image": {
+        "tasks": ("check", "optimize", "thumbnail", "analyze"),
+        "description": "Image processing and optimization"
+    },
+    "payment": {
+        "tasks": ("verify", "batch", "refund-risk"),
+        "description": "AI-powered payment verification and fraud detection"
+    },
+    "health": {
+        "tasks": ("full", "system", "ai", "diagnose", "debug", "logs"),
+        "description": "System health monitoring and auto-debugging"
+    },
+    "analysis": {
+        "tasks": ("insights", "sentiment", "recommend", "predict-stock", "seo-audit", "security-scan", "train", "predict-intent", "seo-keywords"),
+        "description": "Core ML analysis and predictions"
+    },
+    "neural": {
+        "tasks": ("intent", "placement", "pricing", "journey", "churn"),
+        "description": "Neural commerce - purchase intent, product placement, dynamic pricing"
+    },
+    "emotion": {
+        "tasks": ("sentiment", "feedback", "intent", "empathy", "reviews"),
+        "description": "Emotion AI - sentiment analysis, empathetic responses"
+    },
+    "performance": {
+        "tasks": ("analyze", "queries", "cache", "loadtest", "metrics"),
+        "description": "Performance optimizer - query optimization, caching, load testing"
+    },
+    "errors": {
+        "tasks": ("track", "trends", "report", "resolve"),
+        "description": "Error tracker - error tracking, trend analysis, auto-resolution"
+    },
+    "ml": {
+        "tasks": ("predict", "train", "info", "sales", "segment", "demand", "anomaly", "trend"),
+        "description": "Core ML engine - sales prediction, segmentation, forecasting"
+    },
+    "security": {
+        "tasks": ("analyze", "traffic", "scan", "brute-force", "report"),
+        "description": "Security manager - threat detection, vulnerability scanning"
+    },
+    "realtime": {
+        "tasks": ("metric", "stats", "users", "conversions", "inventory", "dashboard"),
+        "description": "Real-time manager - live analytics, active users, conversions"
+    },
+    "seo": {
+        "tasks": ("analyze", "keywords", "meta", "audit", "optimize"),
+        "description": "AI SEO engine - keyword generation, meta tags, site audits"
+    },
+    "sales": {
+        "tasks": ("insights", "forecast", "compare"),
+        "description": "Sales insights - revenue analysis, forecasting, period comparison"
+    }
+}
+CAPABILITIES = MappingProxyType(_CAPABILITIES)
+CAPABILITIES_JSON = _dumpb(CAPABILITIES)
+
+# Engines whose modules expose warm_jit() to pre-compile their numba kernels
+JIT_ENGINES = ('analytics',)
+
+
+def _analytics_forecast(module, data):
+    # Map alternate name if needed
+    forecast_fn = getattr(module, 'sales_forecast', getattr(module, 'sales_forecasting', None))
+    if forecast_fn:
+        return forecast_fn(data)
+    return {"error": "Forecast function not found"}
+
+
+# Shared read-only defaults for missing request fields, so handlers don't allocate a fresh [] or {} per call
+_EMPTY_LIST = ()
+_EMPTY_DICT = MappingProxyType({})
+
+# engine -> {task: handler(target, data)}; the None task is the fallback for any other task
+ENGINE_ROUTES = {
+    # Recommendation Engine
+    'recommend': {
+        'recommend': lambda e, d: e.get_recommendations(d),
+        'content': lambda e, d: e.content_based_recommendations(d.get('product'), d.get('allProducts')),
+        'similar': lambda e, d: e.get_similar_products(d.get("product_id"), d.get("products", _EMPTY_LIST), d.get("limit", 10)),
+        'collaborative': lambda e, d: e.get_collaborative_recommendations(d.get("user_id"), d.get("orders", _EMPTY_LIST), d.get("products", _EMPTY_LIST), d.get("limit", 10)),
+        'trending': lambda e, d: {"trending": e.trending_products(d.get("orders", _EMPTY_LIST), d.get("products", _EMPTY_LIST), d.get("days", 7), d.get("limit", 10))},
+        'together': lambda e, d: e.frequently_bought_together(d.get("orders", _EMPTY_LIST), d.get("limit", 10)),
+        'personalized': lambda e, d: e.recommend(d.get("user_id"), d.get("orders", _EMPTY_LIST), d.get("products", _EMPTY_LIST), d.get("limit", 10))
+    },
+
+    # Neural Commerce Engine
+    'neural': {
+        'intent': lambda e, d: e.predict_purchase_intent(d),
+        'optimize': lambda e, d: e.optimize_product_placement(d),
+        'placement': lambda e, d: e.optimize_product_placement(d),
+        'pricing': lambda e, d: e.generate_dynamic_pricing(d),
+        'journey': lambda e, d: e.customer_journey_optimization(d),
+        'churn': lambda e, d: e.predict_churn(d)
+    },
+
+    # Fraud Detection (every task runs the transaction analysis)
+    'fraud': {
+        None: lambda e, d: e.analyze_transaction(d.get('transaction'), d.get('history'))
+    },
+
+    # Analytics Engine (uses standalone functions)
+    'analytics': {
+        'rfm': lambda m, d: m.calculate_rfm_scores(d),
+        'cohort': lambda m, d: m.cohort_analysis(d),
+        'forecast': _analytics_forecast,
+        'product-performance': lambda m, d: m.product_performance(d),
+        'ab-test': lambda m, d: m.ab_test_analysis(d)
+    },
+
+    # Email Templates Engine (template type comes from the data)
+    'email': {
+        None: lambda m, d: m.generate_email(d)
+    },
+
+    # Search Engine
+    'search': {
+        'search': lambda e, d: e.search(d.get("query", ""), d.get("products", _EMPTY_LIST), d.get("options", _EMPTY_DICT)),
+        'autocomplete': lambda e, d: e.autocomplete(d.get("query", "")),
+        'index': lambda e, d: e.build_index(d.get("products", _EMPTY_LIST)),
+        'trending': lambda e, d: e.trending_searches(d.get("history", _EMPTY_LIST))
+    },
+
+    # Price Optimizer Engine
+    'price': {
+        'optimize': lambda e, d: e.optimize_price(d.get("product", _EMPTY_DICT), d.get("competitors", _EMPTY_LIST), d.get("demand", _EMPTY_DICT)),
+        'bundle': lambda e, d: e.bundle_pricing(d.get("products", _EMPTY_LIST), d.get("discount", 15)),
+        'clearance': lambda e, d: e.optimize_price(d.get("product", _EMPTY_DICT), _EMPTY_LIST, {"is_clearance": True}),
+        'seasonal': lambda e, d: e.optimize_price(d.get("product", _EMPTY_DICT), _EMPTY_LIST, {"is_seasonal": True}),
+        'margin': lambda e, d: e.margin_analysis(d.get("products", _EMPTY_LIST))
+    },
+
+    # Image Processor Engine
+    'image': {
+        'check': lambda m, d: m.check_dependencies(),
+        'optimize': lambda m, d: m.optimize_image(d),
+        'thumbnail': lambda m, d: m.generate_thumbnail(d),
+        'analyze': lambda m, d: m.analyze_image(d)
+    },
+
+    # Payment Verification Engine
+    'payment': {
+        'verify': lambda e, d: e.verify_payment(d),
+        'batch': lambda e, d: e.batch_verify(d),
+        'refund-risk': lambda e, d: e.analyze_refund_risk(d)
+    },
+
+    # Health Monitor Engine
+    'health': {
+        'full': lambda e, d: e.full_health_check(),
+        'check': lambda e, d: e.full_health_check(),
+        'system': lambda e, d: e.system_monitor.get_system_health(),
+        'ai': lambda e, d: e.ai_checker.check_all_engines(),
+        'engines': lambda e, d: e.ai_checker.check_all_engines(),
+        'diagnose': lambda e, d: e.ai_checker.diagnose_engine(d.get('engine', 'hub')),
+        'debug': lambda e, d: e.debugger.analyze_error(d.get('error', d)),
+        'logs': lambda e, d: e.debugger.analyze_logs(d.get('logs', _EMPTY_LIST))
+    },
+
+    # Analysis Engine (legacy compatibility)
+    'analysis': {
+        'insights': lambda m, d: m.generate_insights(d),
+        'sentiment': lambda m, d: m.analyze_sentiment(d.get('text', '')),
+        'recommend': lambda m, d: m.recommend_products(d),
+        'predict-stock': lambda m, d: m.predict_stock_out(d),
+        'seo-audit': lambda m, d: m.audit_seo(d),
+        'security-scan': lambda m, d: m.scan_security(d),
+        'train': lambda m, d: m.train_model(d),
+        'predict-intent': lambda m, d: m.predict_intent(d),
+        'seo-keywords': lambda m, d: m.generate_keywords(d)
+    },
+
+    # Emotion AI Engine
+    'emotion': {
+        'sentiment': lambda e, d: e.analyze_sentiment(d),
+        'feedback': lambda e, d: e.analyze_customer_feedback(d),
+        'intent': lambda e, d: e.detect_customer_intent(d),
+        'empathy': lambda e, d: e.generate_empathetic_response(d),
+        'reviews': lambda e, d: e.analyze_review_emotions(d)
+    },
+
+    # Performance Optimizer Engine
+    'performance': {
+        'analyze': lambda e, d: e.analyze_performance(d),
+        'queries': lambda e, d: e.optimize_queries(d),
+        'cache': lambda e, d: e.cache_recommendations(d),
+        'loadtest': lambda e, d: e.load_test_analysis(d),
+        'metrics': lambda e, d: e.analyze_performance(d)
+    },
+
+    # Error Tracker Engine
+    'errors': {
+        'track': lambda e, d: e.track_error(d),
+        'trends': lambda e, d: e.analyze_error_trends(d),
+        'report': lambda e, d: e.generate_error_report(d),
+        'resolve': lambda e, d: e.auto_resolve(d)
+    },
+
+    # ML Engine (Core Machine Learning)
+    'ml': {
+        'predict': lambda e, d: e.predict(d.get('modelId', d.get('modelType', 'sales_predictor')), d),
+        'train': lambda e, d: e.train(d.get('modelId', d.get('modelType', 'all')), d),
+        'info': lambda e, d: e.get_model_info(d.get('modelId', d.get('modelType'))),
+        'sales': lambda e, d: e.predict('sales_predictor', d),
+        'segment': lambda e, d: e.predict('customer_segmentation', d),
+        'demand': lambda e, d: e.predict('demand_forecaster', d),
+        'anomaly': lambda e, d: e.predict('anomaly_detector', d),
+        'trend': lambda e, d: e.predict('trend_analyzer', d)
+    },
+
+    # Security Manager Engine
+    'security': {
+        'analyze': lambda e, d: e.analyze_request(d),
+        'traffic': lambda e, d: e.analyze_traffic(d),
+        'scan': lambda e, d: e.vulnerability_scan(d),
+        'brute-force': lambda e, d: e.detect_brute_force(d),
+        'report': lambda e, d: e.generate_security_report(d)
+    },
+
+    # Real-Time Manager Engine
+    'realtime': {
+        'metric': lambda e, d: e.process_metric(d),
+        'stats': lambda e, d: e.get_live_stats(d),
+        'users': lambda e, d: e.track_active_users(d),
+        'conversions': lambda e, d: e.track_conversions(d),
+        'inventory': lambda e, d: e.monitor_inventory(d),
+        'dashboard': lambda e, d: e.aggregate_dashboard(d)
+    },
+
+    # SEO Engine
+    'seo': {
+        'analyze': lambda e, d: e.analyze_page(d),
+        'keywords': lambda e, d: e.generate_keywords(d),
+        'meta': lambda e, d: e.generate_meta_tags(d),
+        'audit': lambda e, d: e.audit_site(d),
+        'optimize': lambda e, d: e.optimize_content(d)
+    },
+
+    # Sales Insights Engine
+    'sales': {
+        'insights': lambda e, d: e.generate_insights(d),
+        'forecast': lambda e, d: e.forecast_sales(d),
+        'compare': lambda e, d: e.compare_periods(d)
+    }
+}
+
+# Intern the routing keys so lookups with interned command names compare by identity
+ENGINE_ROUTES = {
+    sys.intern(engine): {task and sys.intern(task): handler for task, handler in tasks.items()}
+    for engine, tasks in ENGINE_ROUTES.items()
+}
+
+
 # ==========================================
 # AI HUB
 # ==========================================
@@ -87,30 +462,57 @@ class EngineLoader:
 class AIHub:
     def __init__(self):
         self.loader = EngineLoader()
-    
-    def _inject_context_data(self, data):
-        """Autonomously infuse local data into AI requests"""
-        data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        self._engine_instances = {}
+        self._ctx_cache = {}
         
-        # Mapping of data types to their JSON file sources
-        sources = {
-            'allProducts': 'products.json',
-            'allOrders': 'orders.json',
-            'allUsers': 'users.json',
-            'allTraffic': 'traffic.json'
+        # Mapping of data types to their JSON file sources and the list key used when the file holds an object
+        data_dir = SCRIPT_DIR.parent / 'data'
+        self._ctx_sources = {
+            'allProducts': (data_dir / 'products.json', 'products'),
+            'allOrders': (data_dir / 'orders.json', 'orders'),
+            'allUsers': (data_dir / 'users.json', 'users'),
+            'allTraffic': (data_dir / 'traffic.json', 'visits')
         }
+    
+    def _get_engine(self, engine_name, class_name):
+        """Get a cached engine instance, creating it on first use"""
+        key = (engine_name, class_name)
+        engine = self._engine_instances.get(key)
+        if engine is None:
+            module = self.loader.load_engine(engine_name)
+            if not module:
+                return None
+            engine = self._engine_instances[key] = getattr(module, class_name)()
+        return engine
+    
+    def _load_context_file(self, path):
+        """Parse a context JSON file, reusing the cached result while its mtime is unchanged"""
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        
+        cached = self._ctx_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         
-        for key, filename in sources.items():
-            if key not in data:
-                path = os.path.join(data_dir, filename)
-                if os.path.exists(path):
-                    try:
-                        with open(path, 'r', encoding='utf-8') as f:
-                            raw = json.load(f)
-                            if isinstance(raw, list): data[key] = raw
-                            elif isinstance(raw, dict): data[key] = raw.get(key.replace('all', '').lower() + 's', [])
-                    except:
-                        pass
+        try:
+            raw = _loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        
+        self._ctx_cache[path] = (mtime, raw)
+        return raw
+    
+    def _inject_context_data(self, data):
+        """Autonomously infuse local data into AI requests"""
+        for key, (path, list_key) in self._ctx_sources.items():
+            if key in data:
+                continue
+            
+            raw = self._load_context_file(path)
+            if isinstance(raw, list): data[key] = raw
+            elif isinstance(raw, dict): data[key] = raw.get(list_key, [])
         return data
 
     def route_request(self, engine_name, task, data):
@@ -120,384 +522,27 @@ class AIHub:
         if isinstance(data, dict) and 'inject_context' in data:
             data = self._inject_context_data(data)
 
-        # Recommendation Engine
-        if engine_name == 'recommend':
-            module = self.loader.load_engine('recommend')
-            engine = module.RecommendationEngine()
-            if task == 'recommend':
-                return engine.get_recommendations(data)
-            elif task == 'content':
-                return engine.content_based_recommendations(data.get('product'), data.get('allProducts'))
-
-        # Neural Commerce
-        if engine_name == 'neural':
-            module = self.loader.load_engine('neural')
-            engine = module.NeuralCommerceEngine()
-            if task == 'intent':
-                return engine.predict_purchase_intent(data)
-            elif task == 'optimize':
-                return engine.optimize_product_placement(data)
-
-        # Fraud Detection
-        if engine_name == 'fraud':
-            module = self.loader.load_engine('fraud')
-            engine = module.FraudDetector()
-            return engine.analyze_transaction(data.get('transaction'), data.get('history'))
-
-        # Analytics Engine (uses standalone functions)
-        if engine_name == 'analytics':
-            module = self.loader.load_engine('analytics')
-            if not module:
-                return {"error": "Analytics engine not available"}
-            
-            if task == 'rfm':
-                return module.calculate_rfm_scores(data)
-            elif task == 'cohort':
-                return module.cohort_analysis(data)
-            elif task == 'forecast':
-                # Map alternate name if needed
-                forecast_fn = getattr(module, 'sales_forecast', getattr(module, 'sales_forecasting', None))
-                if forecast_fn:
-                    return forecast_fn(data)
-                return {"error": "Forecast function not found"}
-            elif task == 'product-performance':
-                return module.product_performance(data)
-            elif task == 'ab-test':
-                return module.ab_test_analysis(data)
-        
-        # Fraud Detection Engine
-        elif engine_name == 'fraud':
-            module = self.loader.load_engine('fraud')
-            if not module:
-                return {"error": "Fraud detection engine not available"}
-            
-            if task == 'analyze':
-                return module.analyze_fraud(data)
-            elif task == 'batch':
-                return module.batch_analyze(data)
-            elif task == 'stats':
-                return module.get_fraud_stats(data)
+        tasks = ENGINE_ROUTES.get(engine_name)
+        handler = tasks and (tasks.get(task) or tasks.get(None))
+        if handler is None:
+            return {"error": f"Unknown engine or task: {engine_name}/{task}"}
         
-        # Email Templates Engine
-        elif engine_name == 'email':
-            module = self.loader.load_engine('email')
-            if not module:
-                return {"error": "Email template engine not available"}
-            
-            return module.generate_email(data)
+        class_name, unavailable = ENGINE_TARGETS[engine_name]
+        if class_name:
+            target = self._get_engine(engine_name, class_name)
+        else:
+            target = self.loader.load_engine(engine_name)
+        if not target:
+            return {"error": unavailable}
         
-        # Search Engine
-        elif engine_name == 'search':
-            module = self.loader.load_engine('search')
-            if not module:
-                return {"error": "Search engine not available"}
-            
-            engine = module.SearchEngine()
-            
-            if task == 'search':
-                return engine.search(data.get("query", ""), data.get("products", []), data.get("options", {}))
-            elif task == 'autocomplete':
-                return engine.autocomplete(data.get("query", ""))
-            elif task == 'index':
-                return engine.build_index(data.get("products", []))
-            elif task == 'trending':
-                return engine.trending_searches(data.get("history", []))
-        
-        # Recommendation Engine
-        elif engine_name == 'recommend':
-            module = self.loader.load_engine('recommend')
-            if not module:
-                return {"error": "Recommendation engine not available"}
-            
-            engine = module.RecommendationEngine()
-            
-            if task == 'similar':
-                return engine.get_similar_products(data.get("product_id"), data.get("products", []), data.get("limit", 10))
-            elif task == 'collaborative':
-                return engine.get_collaborative_recommendations(data.get("user_id"), data.get("orders", []), data.get("products", []), data.get("limit", 10))
-            elif task == 'trending':
-                return {"trending": engine.trending_products(data.get("orders", []), data.get("products", []), data.get("days", 7), data.get("limit", 10))}
-            elif task == 'together':
-                return engine.frequently_bought_together(data.get("orders", []), data.get("limit", 10))
-            elif task == 'personalized':
-                return engine.recommend(data.get("user_id"), data.get("orders", []), data.get("products", []), data.get("limit", 10))
-        
-        # Price Optimizer Engine
-        elif engine_name == 'price':
-            module = self.loader.load_engine('price')
-            if not module:
-                return {"error": "Price optimizer not available"}
-            
-            engine = module.PriceOptimizer()
-            
-            if task == 'optimize':
-                return engine.optimize_price(data.get("product", {}), data.get("competitors", []), data.get("demand", {}))
-            elif task == 'bundle':
-                return engine.bundle_pricing(data.get("products", []), data.get("discount", 15))
-            elif task == 'clearance':
-                return engine.optimize_price(data.get("product", {}), [], {"is_clearance": True})
-            elif task == 'seasonal':
-                return engine.optimize_price(data.get("product", {}), [], {"is_seasonal": True})
-            elif task == 'margin':
-                return engine.margin_analysis(data.get("products", []))
-        
-        # Image Processor Engine
-        elif engine_name == 'image':
-            module = self.loader.load_engine('image')
-            if not module:
-                return {"error": "Image processor not available"}
-            
-            if task == 'check':
-                return module.check_dependencies()
-            elif task == 'optimize':
-                return module.optimize_image(data)
-            elif task == 'thumbnail':
-                return module.generate_thumbnail(data)
-            elif task == 'analyze':
-                return module.analyze_image(data)
-        
-        # Payment Verification Engine
-        elif engine_name == 'payment':
-            module = self.loader.load_engine('payment')
-            if not module:
-                return {"error": "Payment verification engine not available"}
-            
-            verifier = module.PaymentVerificationAI()
-            
-            if task == 'verify':
-                return verifier.verify_payment(data)
-            elif task == 'batch':
-                return verifier.batch_verify(data)
-            elif task == 'refund-risk':
-                return verifier.analyze_refund_risk(data)
-        
-        # Health Monitor Engine
-        elif engine_name == 'health':
-            module = self.loader.load_engine('health')
-            if not module:
-                return {"error": "Health monitor engine not available"}
-            
-            orchestrator = module.HealthMonitorOrchestrator()
-            
-            if task == 'full' or task == 'check':
-                return orchestrator.full_health_check()
-            elif task == 'system':
-                return orchestrator.system_monitor.get_system_health()
-            elif task == 'ai' or task == 'engines':
-                return orchestrator.ai_checker.check_all_engines()
-            elif task == 'diagnose':
-                return orchestrator.ai_checker.diagnose_engine(data.get('engine', 'hub'))
-            elif task == 'debug':
-                return orchestrator.debugger.analyze_error(data.get('error', data))
-            elif task == 'logs':
-                return orchestrator.debugger.analyze_logs(data.get('logs', []))
-        
-        # Analysis Engine (legacy compatibility)
-        elif engine_name == 'analysis':
-            module = self.loader.load_engine('analysis')
-            if not module:
-                return {"error": "Analysis engine not available"}
-            
-            if task == 'insights':
-                return module.generate_insights(data)
-            elif task == 'sentiment':
-                return module.analyze_sentiment(data.get('text', ''))
-            elif task == 'recommend':
-                return module.recommend_products(data)
-            elif task == 'predict-stock':
-                return module.predict_stock_out(data)
-            elif task == 'seo-audit':
-                return module.audit_seo(data)
-            elif task == 'security-scan':
-                return module.scan_security(data)
-            elif task == 'train':
-                return module.train_model(data)
-            elif task == 'predict-intent':
-                return module.predict_intent(data)
-            elif task == 'seo-keywords':
-                return module.generate_keywords(data)
-        
-        # Neural Commerce Engine
-        elif engine_name == 'neural':
-            module = self.loader.load_engine('neural')
-            if not module:
-                return {"error": "Neural commerce engine not available"}
-            
-            engine = module.NeuralCommerceEngine()
-            
-            if task == 'intent':
-                return engine.predict_purchase_intent(data)
-            elif task == 'placement':
-                return engine.optimize_product_placement(data)
-            elif task == 'pricing':
-                return engine.generate_dynamic_pricing(data)
-            elif task == 'journey':
-                return engine.customer_journey_optimization(data)
-            elif task == 'churn':
-                return engine.predict_churn(data)
-        
-        # Emotion AI Engine
-        elif engine_name == 'emotion':
-            module = self.loader.load_engine('emotion')
-            if not module:
-                return {"error": "Emotion AI engine not available"}
-            
-            engine = module.EmotionAIEngine()
-            
-            if task == 'sentiment':
-                return engine.analyze_sentiment(data)
-            elif task == 'feedback':
-                return engine.analyze_customer_feedback(data)
-            elif task == 'intent':
-                return engine.detect_customer_intent(data)
-            elif task == 'empathy':
-                return engine.generate_empathetic_response(data)
-            elif task == 'reviews':
-                return engine.analyze_review_emotions(data)
-        
-        # Performance Optimizer Engine
-        elif engine_name == 'performance':
-            module = self.loader.load_engine('performance')
-            if not module:
-                return {"error": "Performance optimizer engine not available"}
-            
-            engine = module.PerformanceOptimizer()
-            
-            if task == 'analyze':
-                return engine.analyze_performance(data)
-            elif task == 'queries':
-                return engine.optimize_queries(data)
-            elif task == 'cache':
-                return engine.cache_recommendations(data)
-            elif task == 'loadtest':
-                return engine.load_test_analysis(data)
-            elif task == 'metrics':
-                return engine.analyze_performance(data)
-        
-        # Error Tracker Engine
-        elif engine_name == 'errors':
-            module = self.loader.load_engine('errors')
-            if not module:
-                return {"error": "Error tracker engine not available"}
-            
-            engine = module.ErrorTrackerEngine()
-            
-            if task == 'track':
-                return engine.track_error(data)
-            elif task == 'trends':
-                return engine.analyze_error_trends(data)
-            elif task == 'report':
-                return engine.generate_error_report(data)
-            elif task == 'resolve':
-                return engine.auto_resolve(data)
-        
-        # ML Engine (Core Machine Learning)
-        elif engine_name == 'ml':
-            module = self.loader.load_engine('ml')
-            if not module:
-                return {"error": "ML engine not available"}
-            
-            engine = module.MLEngine()
-            
-            if task == 'predict':
-                return engine.predict(data.get('modelId', data.get('modelType', 'sales_predictor')), data)
-            elif task == 'train':
-                return engine.train(data.get('modelId', data.get('modelType', 'all')), data)
-            elif task == 'info':
-                return engine.get_model_info(data.get('modelId', data.get('modelType')))
-            elif task == 'sales':
-                return engine.predict('sales_predictor', data)
-            elif task == 'segment':
-                return engine.predict('customer_segmentation', data)
-            elif task == 'demand':
-                return engine.predict('demand_forecaster', data)
-            elif task == 'anomaly':
-                return engine.predict('anomaly_detector', data)
-            elif task == 'trend':
-                return engine.predict('trend_analyzer', data)
-        
-        # Security Manager Engine
-        elif engine_name == 'security':
-            module = self.loader.load_engine('security')
-            if not module:
-                return {"error": "Security manager engine not available"}
-            
-            engine = module.SecurityManager()
-            
-            if task == 'analyze':
-                return engine.analyze_request(data)
-            elif task == 'traffic':
-                return engine.analyze_traffic(data)
-            elif task == 'scan':
-                return engine.vulnerability_scan(data)
-            elif task == 'brute-force':
-                return engine.detect_brute_force(data)
-            elif task == 'report':
-                return engine.generate_security_report(data)
-        
-        # Real-Time Manager Engine
-        elif engine_name == 'realtime':
-            module = self.loader.load_engine('realtime')
-            if not module:
-                return {"error": "Real-time manager engine not available"}
-            
-            engine = module.RealTimeManager()
-            
-            if task == 'metric':
-                return engine.process_metric(data)
-            elif task == 'stats':
-                return engine.get_live_stats(data)
-            elif task == 'users':
-                return engine.track_active_users(data)
-            elif task == 'conversions':
-                return engine.track_conversions(data)
-            elif task == 'inventory':
-                return engine.monitor_inventory(data)
-            elif task == 'dashboard':
-                return engine.aggregate_dashboard(data)
-        
-        # SEO Engine
-        elif engine_name == 'seo':
-            module = self.loader.load_engine('seo')
-            if not module:
-                return {"error": "SEO engine not available"}
-            
-            engine = module.AISEOEngine()
-            
-            if task == 'analyze':
-                return engine.analyze_page(data)
-            elif task == 'keywords':
-                return engine.generate_keywords(data)
-            elif task == 'meta':
-                return engine.generate_meta_tags(data)
-            elif task == 'audit':
-                return engine.audit_site(data)
-            elif task == 'optimize':
-                return engine.optimize_content(data)
-        
-        # Sales Insights Engine
-        elif engine_name == 'sales':
-            module = self.loader.load_engine('sales')
-            if not module:
-                return {"error": "Sales insights engine not available"}
-            
-            engine = module.SalesInsightsEngine()
-            
-            if task == 'insights':
-                return engine.generate_insights(data)
-            elif task == 'forecast':
-                return engine.forecast_sales(data)
-            elif task == 'compare':
-                return engine.compare_periods(data)
-        
-        return {"error": f"Unknown engine or task: {engine_name}/{task}"}
+        return handler(target, data)
     
     def health_check(self):
         """Check health of all engines"""
         engines = self.loader.get_available_engines()
         health = {
             "status": "healthy",
-            "timestamp": __import__('datetime').datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(),
             "engines": engines,
             "availableCount": len([e for e in engines if e['exists']]),
             "totalCount": len(engines)
@@ -508,86 +553,72 @@ class AIHub:
         
         return health
     
+    def warm_jit(self):
+        """Trigger numba compilation (or on-disk cache load) for engines that provide kernels"""
+        warmed = {}
+        for engine_name in JIT_ENGINES:
+            module = self.loader.load_engine(engine_name)
+            if not module:
+                continue
+            
+            try:
+                warm = getattr(module, 'warm_jit', None)
+                if warm is not None:
+                    warmed[engine_name] = warm()
+            except Exception as e:
+                warmed[engine_name] = {"error": str(e)}
+        return warmed
+    
     def get_capabilities(self):
         """Get all available AI capabilities"""
-        return {
-            "analytics": {
-                "tasks": ["rfm", "cohort", "forecast", "product-performance", "ab-test"],
-                "description": "Customer and sales analytics"
-            },
-            "fraud": {
-                "tasks": ["analyze", "batch", "stats"],
-                "description": "Transaction fraud detection"
-            },
-            "email": {
-                "tasks": ["welcome", "order_confirmation", "shipping", "password_reset", "abandoned_cart", "review_request"],
-                "description": "Email template generation"
-            },
-            "search": {
-                "tasks": ["search", "autocomplete", "index", "trending"],
-                "description": "Full-text search with fuzzy matching"
-            },
-            "recommend": {
-                "tasks": ["similar", "collaborative", "trending", "together", "personalized"],
-                "description": "Product recommendations"
-            },
-            "price": {
-                "tasks": ["optimize", "bundle", "clearance", "seasonal", "margin"],
-                "description": "Dynamic pricing optimization"
-            },
-            "image": {
-                "tasks": ["check", "optimize", "thumbnail", "analyze"],
-                "description": "Image processing and optimization"
-            },
-            "payment": {
-                "tasks": ["verify", "batch", "refund-risk"],
-                "description": "AI-powered payment verification and fraud detection"
-            },
-            "health": {
-                "tasks": ["full", "system", "ai", "diagnose", "debug", "logs"],
-                "description": "System health monitoring and auto-debugging"
-            },
-            "analysis": {
-                "tasks": ["insights", "sentiment", "recommend", "predict-stock", "seo-audit", "security-scan", "train", "predict-intent", "seo-keywords"],
-                "description": "Core ML analysis and predictions"
-            },
-            "neural": {
-                "tasks": ["intent", "placement", "pricing", "journey", "churn"],
-                "description": "Neural commerce - purchase intent, product placement, dynamic pricing"
-            },
-            "emotion": {
-                "tasks": ["sentiment", "feedback", "intent", "empathy", "reviews"],
-                "description": "Emotion AI - sentiment analysis, empathetic responses"
-            },
-            "performance": {
-                "tasks": ["analyze", "queries", "cache", "loadtest", "metrics"],
-                "description": "Performance optimizer - query optimization, caching, load testing"
-            },
-            "errors": {
-                "tasks": ["track", "trends", "report", "resolve"],
-                "description": "Error tracker - error tracking, trend analysis, auto-resolution"
-            },
-            "ml": {
-                "tasks": ["predict", "train", "info", "sales", "segment", "demand", "anomaly", "trend"],
-                "description": "Core ML engine - sales prediction, segmentation, forecasting"
-            },
-            "security": {
-                "tasks": ["analyze", "traffic", "scan", "brute-force", "report"],
-                "description": "Security manager - threat detection, vulnerability scanning"
-            },
-            "realtime": {
-                "tasks": ["metric", "stats", "users", "conversions", "inventory", "dashboard"],
-                "description": "Real-time manager - live analytics, active users, conversions"
-            },
-            "seo": {
-                "tasks": ["analyze", "keywords", "meta", "audit", "optimize"],
-                "description": "AI SEO engine - keyword generation, meta tags, site audits"
-            },
-            "sales": {
-                "tasks": ["insights", "forecast", "compare"],
-                "description": "Sales insights - revenue analysis, forecasting, period comparison"
+        return CAPABILITIES
+
+
+# Usage text for a bare invocation, serialized once like CAPABILITIES_JSON
+HELP_JSON = _dumpb({
+    "name": "BLACKONN AI Hub",
+    "version": "1.0.0",
+    "status": "healthy",
+    "usage": "python ai_hub.py <command> [data]",
+    "commands": {
+        "health": "Check health of all engines",
+        "warm": "Compile (or load cached) numba kernels; run once at start-up",
+        "capabilities": "List all available AI capabilities",
+        "engines": "List all engine files",
+        "serve": "Answer newline-delimited JSON requests from stdin",
+        "<engine>/<task>": "Run a specific task on an engine"
+    },
+    "availableEngines": list(ENGINE_FILES)
+})
+
+
+def serve(hub):
+    """
+    Persistent mode: answer newline-delimited JSON requests from stdin
+    until it closes, so imports and JIT compilation are paid once.
+    Each request is {"engine", "task", "data"}; responses are written
+    one per line in request order.
+    """
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+        
+        try:
+            request = _loads(line)
+            data = request.get('data', {})
+            if data is None:
+                data = {}
+            if not isinstance(data, dict):
+                data = {"data": data}
+            result = hub.route_request(sys.intern(request['engine']), sys.intern(request['task']), data)
+        except Exception as e:
+            result = {
+                "error": str(e),
+                "traceback": format_exc(limit=-5)
             }
-        }
+        
+        _emit(result)
+        sys.stdout.buffer.flush()
 
 
 # ==========================================
@@ -595,72 +626,72 @@ class AIHub:
 # ==========================================
 
 if __name__ == "__main__":
-    hub = AIHub()
-    
     if len(sys.argv) > 1:
         command = sys.argv[1]
         
         try:
-            # Parse input data
-            input_data = {}
-            if len(sys.argv) > 2:
-                if sys.argv[2] == "--stdin":
-                    input_data = json.loads(sys.stdin.read())
-                else:
-                    input_data = json.loads(sys.argv[2])
-            
-            if not isinstance(input_data, dict):
-                input_data = {"data": input_data}
-            
-            # Handle special commands
-            if command == "health" or command == "status":
-                print(json.dumps(hub.health_check()))
-            
-            elif command == "capabilities":
-                print(json.dumps(hub.get_capabilities()))
+            # Handle special commands (they take no input data)
+            if command == "capabilities":
+                sys.stdout.buffer.write(CAPABILITIES_JSON)
             
             elif command == "engines":
-                print(json.dumps({"engines": hub.loader.get_available_engines()}))
+                # Path enumeration only; no hub needed
+                _emit({"engines": EngineLoader.get_available_engines()})
             
             else:
-                # Route to engine (format: engine/task or engine.task)
-                parts = command.replace('.', '/').split('/')
+                hub = AIHub()
+                
+                if command == "health" or command == "status":
+                    _emit(hub.health_check())
+                
+                elif command == "warm":
+                    # Kept out of health: importing numba and loading kernels takes seconds when cold
+                    _emit({"jit": hub.warm_jit()})
+                
+                elif command == "serve":
+                    serve(hub)
                 
-                if len(parts) == 2:
-                    engine_name, task = parts
-                    result = hub.route_request(engine_name, task, input_data)
-                    print(json.dumps(result))
                 else:
-                    print(json.dumps({
-                        "error": f"Invalid command format: {command}",
-                        "usage": "python ai_hub.py engine/task [json_data | --stdin]",
-                        "examples": [
-                            "python ai_hub.py search/search '{\"query\": \"black tshirt\"}'",
-                            "python ai_hub.py recommend/trending --stdin",
-                            "python ai_hub.py health",
-                            "python ai_hub.py capabilities"
-                        ]
-                    }))
+                    # Route to engine (format: engine/task or engine.task)
+                    sep = command.find('/')
+                    if sep < 0:
+                        sep = command.find('.')
+                    
+                    if sep >= 0:
+                        engine_name = sys.intern(command[:sep])
+                        task = sys.intern(command[sep + 1:])
+                        
+                        # Parse input data
+                        raw = ''
+                        if len(sys.argv) > 2:
+                            raw = sys.stdin.read() if sys.argv[2] == "--stdin" else sys.argv[2]
+                        input_data = _loads(raw) if raw else {}
+                        
+                        # Anything but a JSON object is wrapped; the first character tells us without a type check
+                        if raw and raw.lstrip()[:1] != '{':
+                            input_data = {"data": input_data}
+                        
+                        result = hub.route_request(engine_name, task, input_data)
+                        _emit(result)
+                    else:
+                        _emit({
+                            "error": f"Invalid command format: {command}",
+                            "usage": "python ai_hub.py engine/task [json_data | --stdin]",
+                            "examples": [
+                                "python ai_hub.py search/search '{\"query\": \"black tshirt\"}'",
+                                "python ai_hub.py recommend/trending --stdin",
+                                "python ai_hub.py health",
+                                "python ai_hub.py capabilities"
+                            ]
+                        })
         
         except Exception as e:
-            import traceback
-            print(json.dumps({
+            _emit({
                 "error": str(e),
-                "traceback": traceback.format_exc()
-            }))
+                # Innermost frames only; they point at the failing engine code
+                "traceback": format_exc(limit=-5)
+            })
     
     else:
         # No arguments - show help
-        print(json.dumps({
-            "name": "BLACKONN AI Hub",
-            "version": "1.0.0",
-            "status": "healthy",
-            "usage": "python ai_hub.py <command> [data]",
-            "commands": {
-                "health": "Check health of all engines",
-                "capabilities": "List all available AI capabilities",
-                "engines": "List all engine files",
-                "<engine>/<task>": "Run a specific task on an engine"
-            },
-            "availableEngines": list(hub.loader.engine_files.keys())
-        }))
+        sys.stdout.buffer.write(HELP_JSON)
@@ -1,24 +1,42 @@
 import sys
 import json
+import string
 import random
+import heapq
+from itertools import islice
+from functools import wraps
+from collections import Counter
 from datetime import datetime, timedelta
 
+from _jsonio import loads as _loads, dumpb as _dumpb, emit as _emit
+
+
+def require_dict(error):
+    """Return a copy of `error` instead of calling the wrapped function when data is not a dict"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(data):
+            if not isinstance(data, dict):
+                return dict(error)
+            return func(data)
+        return wrapper
+    return decorator
+
+@require_dict({"status": "error", "message": "Input data must be a dictionary"})
 def generate_insights(data):
     # Real-time analysis logic
     insights = []
     
-    if not isinstance(data, dict):
-        return {"status": "error", "message": "Input data must be a dictionary"}
-        
     traffic = data.get('traffic', [])
     if not isinstance(traffic, list): traffic = []
     
     avg_last_3 = 0
     if len(traffic) > 7:
         # Use totalVisits if available, otherwise visits
-        key = 'totalVisits' if len(traffic) > 0 and 'totalVisits' in traffic[0] else 'visits'
-        avg_last_3 = sum([d.get(key, 0) for d in traffic[-3:]]) / 3
-        avg_prev_4 = sum([d.get(key, 0) for d in traffic[-7:-3]]) / 4
+        key = 'totalVisits' if 'totalVisits' in traffic[0] else 'visits'
+        recent = [d.get(key, 0) for d in traffic[-7:]]
+        avg_last_3 = sum(recent[4:]) / 3
+        avg_prev_4 = sum(recent[:4]) / 4
         
         if avg_last_3 > avg_prev_4 * 1.1:
             insights.append({
@@ -28,26 +46,41 @@ def generate_insights(data):
                 "confidence": 0.85
             })
             
+    # Single pass over the full history for the conversion totals
+    total_conversions = 0
+    total_visits = 0
+    for d in traffic:
+        total_conversions += d.get('conversions', 0)
+        total_visits += d.get('visits', 0)
+            
     return {
         "status": "success",
         "timestamp": datetime.now().isoformat(),
         "insights": insights,
         "predictions": {
             "tomorrow_traffic": int(avg_last_3 * 1.05) if len(traffic) > 7 else 0,
-            "conversion_rate": round(sum([d.get('conversions', 0) for d in traffic]) / max(sum([d.get('visits', 0) for d in traffic]), 1) * 100, 2) if traffic else 0.0
+            "conversion_rate": round(total_conversions / max(total_visits, 1) * 100, 2) if traffic else 0.0
         }
     }
 
+POSITIVE_WORDS = frozenset({'good', 'great', 'excellent', 'amazing', 'love', 'happy', 'perfect', 'satisfied', 'thanks', 'thank'})
+NEGATIVE_WORDS = frozenset({'bad', 'poor', 'terrible', 'hate', 'unhappy', 'dissatisfied', 'broken', 'delay', 'worst', 'issue', 'problem', 'angry'})
+URGENT_WORDS = frozenset({'asap', 'immediately'})
 def analyze_sentiment(text):
-    # Simple rule-based sentiment analysis
-    positive_words = {'good', 'great', 'excellent', 'amazing', 'love', 'happy', 'perfect', 'satisfied', 'thanks', 'thank'}
-    negative_words = {'bad', 'poor', 'terrible', 'hate', 'unhappy', 'dissatisfied', 'broken', 'delay', 'worst', 'issue', 'problem', 'angry'}
-    
-    words = text.lower().split()
-    pos_count = sum(1 for w in words if w in positive_words)
-    neg_count = sum(1 for w in words if w in negative_words)
+    # Simple rule-based sentiment analysis; words are stripped of surrounding
+    # punctuation so "great!" and "asap." still count
+    word_count = pos_count = neg_count = urgent_count = 0
+    for w in text.lower().split():
+        w = w.strip(string.punctuation)
+        word_count += 1
+        if w in POSITIVE_WORDS:
+            pos_count += 1
+        elif w in NEGATIVE_WORDS:
+            neg_count += 1
+        elif w in URGENT_WORDS:
+            urgent_count += 1
     
-    score = (pos_count - neg_count) / max(len(words), 1)
+    score = (pos_count - neg_count) / max(word_count, 1)
     
     sentiment = "neutral"
     if score > 0.05: sentiment = "positive"
@@ -56,7 +89,7 @@ def analyze_sentiment(text):
     return {
         "sentiment": sentiment,
         "score": round(score, 3),
-        "urgent": neg_count > 2 or "asap" in words or "immediately" in words
+        "urgent": neg_count > 2 or urgent_count > 0
     }
 
 def recommend_products(data):
@@ -67,64 +100,64 @@ def recommend_products(data):
     recommendations = []
     if not current_product:
         return recommendations
-        
+    
+    cur_id = current_product.get('id')
+    cur_category = current_product.get('category')
+    cur_tags = frozenset(current_product.get('tags') or ())
+    
     for p in all_products:
-        if p.get('id') == current_product.get('id'):
+        pid = p.get('id')
+        if pid == cur_id:
             continue
             
-        score = 0
-        if p.get('category') == current_product.get('category'):
-            score += 5
+        score = 5 if p.get('category') == cur_category else 0
             
         # Tag matching
-        cur_tags = set(current_product.get('tags', []))
-        p_tags = set(p.get('tags', []))
-        score += len(cur_tags.intersection(p_tags)) * 2
+        score += len(cur_tags.intersection(p.get('tags') or ())) * 2
         
         if score > 0:
-            recommendations.append({"id": p.get('id'), "score": score})
+            recommendations.append({"id": pid, "score": score})
             
-    # Sort by score descending
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
-    return recommendations[:4]
+    # Top 4 by score, ties in catalogue order
+    return heapq.nlargest(4, recommendations, key=lambda x: x['score'])
 
+@require_dict({"days_remaining": -1, "status": "Invalid input format"})
 def predict_stock_out(data):
     # ML-based stock depletion prediction
-    if not isinstance(data, dict):
-        return {"days_remaining": -1, "status": "Invalid input format"}
-        
     orders = data.get('orders', [])
     if not isinstance(orders, list): orders = []
     
     product_id = data.get('product_id')
     current_stock = data.get('current_stock', 0)
     
-    # Filter orders for this product
-    relevant_orders = []
+    # Filter orders for this product (parallel date/quantity lists)
+    dates = []
+    quantities = []
     for o in orders:
         if not isinstance(o, dict): continue
         items = o.get('items', [])
         if not isinstance(items, list): continue
         for item in items:
             if item.get('id') == product_id or item.get('productId') == product_id:
-                relevant_orders.append({
-                    "date": o.get('createdAt') or o.get('date'),
-                    "quantity": item.get('quantity', 1)
-                })
+                dates.append(o.get('createdAt') or o.get('date'))
+                quantities.append(item.get('quantity', 1))
     
-    if len(relevant_orders) < 3:
+    if len(dates) < 3:
         return {"days_remaining": -1, "status": "Insufficient data"}
         
     # Simple linear regression approximation for depletion rate
     try:
-        total_qty = sum(o['quantity'] for o in relevant_orders)
+        total_qty = sum(quantities)
+        
+        # One clock reading serves both missing dates and the prediction date
+        now = datetime.now()
         
         def parse_date(date_str):
-            if not date_str: return datetime.now()
+            if not date_str: return now
             return datetime.fromisoformat(date_str.replace('Z', ''))
 
-        first_date = parse_date(relevant_orders[0]['date'])
-        last_date = parse_date(relevant_orders[-1]['date'])
+        first_date = parse_date(dates[0])
+        last_date = parse_date(dates[-1])
         
         days_diff = max(1, (last_date - first_date).days)
         daily_rate = total_qty / days_diff
@@ -136,38 +169,38 @@ def predict_stock_out(data):
         return {
             "days_remaining": days_remaining,
             "daily_sales_avg": round(daily_rate, 2),
-            "prediction_date": (datetime.now() + timedelta(days=days_remaining)).isoformat(),
+            "prediction_date": (now + timedelta(days=days_remaining)).isoformat(),
             "is_critical": days_remaining < 7
         }
     except Exception as e:
         return {"days_remaining": -1, "status": "Error: " + str(e)}
 
+# (field, min length, max length, missing message, too short message, too long message)
+SEO_LENGTH_RULES = (
+    ('title', 30, 60, "Title tag is missing",
+     "Title tag is too short (< 30 characters)", "Title tag is too long (> 60 characters)"),
+    ('description', 120, None, "Meta description is missing",
+     "Meta description is too short (< 120 characters)", None),
+)
+
 def audit_seo(data):
     # Technical SEO Audit logic
     elements = data.get('elements', {})
     score = 100
     issues = []
     
-    # Title Tag
-    title = elements.get('title', '')
-    if not title:
-        score -= 20
-        issues.append("Title tag is missing")
-    elif len(title) < 30:
-        score -= 5
-        issues.append("Title tag is too short (< 30 characters)")
-    elif len(title) > 60:
-        score -= 5
-        issues.append("Title tag is too long (> 60 characters)")
-        
-    # Meta Description
-    description = elements.get('description', '')
-    if not description:
-        score -= 20
-        issues.append("Meta description is missing")
-    elif len(description) < 120:
-        score -= 5
-        issues.append("Meta description is too short (< 120 characters)")
+    # Title Tag and Meta Description
+    for field, min_len, max_len, missing, too_short, too_long in SEO_LENGTH_RULES:
+        value = elements.get(field)
+        if not value:
+            score -= 20
+            issues.append(missing)
+        elif len(value) < min_len:
+            score -= 5
+            issues.append(too_short)
+        elif max_len is not None and len(value) > max_len:
+            score -= 5
+            issues.append(too_long)
         
     # Keywords
     keywords = elements.get('keywords', [])
@@ -181,17 +214,39 @@ def audit_seo(data):
         "timestamp": datetime.now().isoformat()
     }
 
+ADMIN_EVENT_TYPES = frozenset({'admin_settings_change', 'product_delete'})
+
 def scan_security(data):
     # Suspicious pattern detection
     events = data.get('events', [])
     suspicious = []
     
-    # 1. Bruteforce detection (many login failures from same IP)
-    login_fails = {}
+    # One pass over the events feeds both checks
+    login_fails = Counter()
+    late_night = []
     for e in events:
-        if e.get('type') == 'login_failure':
-            ip = e.get('ip')
-            login_fails[ip] = login_fails.get(ip, 0) + 1
+        etype = e.get('type')
+        
+        # 1. Bruteforce detection (many login failures from same IP)
+        if etype == 'login_failure':
+            login_fails[e.get('ip')] += 1
+            continue
+        
+        # 2. Unusual hours: late night modification?
+        if etype not in ADMIN_EVENT_TYPES:
+            continue
+        # ISO-8601 puts the hour at a fixed offset, so read it straight from the string
+        ts = e.get('timestamp')
+        if not isinstance(ts, str) or len(ts) < 13 or ts[10] not in ('T', ' '):
+            continue
+        hour = ts[11:13]
+        if hour.isdigit() and 1 <= int(hour) <= 4:
+            late_night.append({
+                "id": e.get('id'),
+                "reason": "Administrative action during unusual hours (1 AM - 4 AM)",
+                "severity": "medium",
+                "ip": e.get('ip')
+            })
             
     for ip, count in login_fails.items():
         if count > 5:
@@ -200,30 +255,13 @@ def scan_security(data):
                 "reason": f"High login failure rate ({count} attempts)",
                 "severity": "high"
             })
-            
-    # 2. Unusual hours
-    for e in events:
-        try:
-            ts = datetime.fromisoformat(e.get('timestamp').replace('Z', ''))
-            if ts.hour >= 1 and ts.hour <= 4:
-                # Late night modification?
-                if e.get('type') in ['admin_settings_change', 'product_delete']:
-                    suspicious.append({
-                        "id": e.get('id'),
-                        "reason": "Administrative action during unusual hours (1 AM - 4 AM)",
-                        "severity": "medium",
-                        "ip": e.get('ip')
-                    })
-        except:
-            continue
+    suspicious.extend(late_night)
             
     return suspicious
 
+@require_dict({"success": False, "error": "Invalid data format"})
 def train_model(data):
     # Simulate training process based on data volume
-    if not isinstance(data, dict):
-        return {"success": False, "error": "Invalid data format"}
-        
     traffic = data.get('traffic', [])
     if not isinstance(traffic, list): traffic = []
     
@@ -267,6 +305,8 @@ def predict_intent(data):
         "recommendations": recommend_products(data)
     }
 
+TRENDING_KEYWORDS = ("black streetwear india", "minimalist black fashion", "blackonn clothing brand")
+
 def generate_keywords(data):
     products = data.get('products', [])
     keywords = []
@@ -283,10 +323,11 @@ def generate_keywords(data):
             keywords.append(f"oversized {cat} fashion")
             
     # Add trending data if available
-    keywords.extend(["black streetwear india", "minimalist black fashion", "blackonn clothing brand"])
+    keywords.extend(TRENDING_KEYWORDS)
     
     return {
-        "suggestions": list(set(keywords))[:50],
+        # Deduplicate in insertion order so the suggestions are stable between runs
+        "suggestions": list(islice(dict.fromkeys(keywords), 50)),
         "relevance_scores": {k: 0.8 + (0.1 if "blackonn" in k else 0) for k in keywords[:10]}
     }
 
@@ -297,37 +338,37 @@ if __name__ == "__main__":
             input_data = {}
             if len(sys.argv) > 2:
                 if sys.argv[2] == "--stdin":
-                    input_data = json.loads(sys.stdin.read())
+                    input_data = _loads(sys.stdin.buffer.read())
                 else:
-                    input_data = json.loads(sys.argv[2])
+                    input_data = _loads(sys.argv[2])
             
             # Ensure input_data is a dictionary for safety
             if not isinstance(input_data, dict):
                 input_data = {"data": input_data}
                 
             if task == "insights":
-                print(json.dumps(generate_insights(input_data)))
+                _emit(generate_insights(input_data))
             elif task == "sentiment":
-                print(json.dumps(analyze_sentiment(input_data.get('text', ''))))
+                _emit(analyze_sentiment(input_data.get('text', '')))
             elif task == "recommend":
-                print(json.dumps(recommend_products(input_data)))
+                _emit(recommend_products(input_data))
             elif task == "predict-stock":
-                print(json.dumps(predict_stock_out(input_data)))
+                _emit(predict_stock_out(input_data))
             elif task == "predict-intent":
-                print(json.dumps(predict_intent(input_data)))
+                _emit(predict_intent(input_data))
             elif task == "seo-keywords":
-                print(json.dumps(generate_keywords(input_data)))
+                _emit(generate_keywords(input_data))
             elif task == "seo-audit":
-                print(json.dumps(audit_seo(input_data)))
+                _emit(audit_seo(input_data))
             elif task == "security-scan":
-                print(json.dumps(scan_security(input_data)))
+                _emit(scan_security(input_data))
             elif task == "train" or task == "ml-train":
-                print(json.dumps(train_model(input_data)))
+                _emit(train_model(input_data))
             elif task == "status" or task == "health":
-                print(json.dumps({"status": "healthy", "version": "1.0.0"}))
+                _emit({"status": "healthy", "version": "1.0.0"})
             else:
-                print(json.dumps({"error": "Unknown task: " + task}))
+                _emit({"error": "Unknown task: " + task})
         except Exception as e:
-            print(json.dumps({"error": str(e)}))
+            _emit({"error": str(e)})
     else:
-        print(json.dumps({"status": "healthy", "engine": "Blackonn AI v1.0"}))
+        _emit({"status": "healthy", "engine": "Blackonn AI v1.0"})
@@ -6,14 +6,160 @@ Provides statistical analysis, customer segmentation, and business intelligence
 
 import json
 import sys
+import os
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, Counter
+from functools import lru_cache
+import heapq
+from importlib.util import find_spec
+from pathlib import Path
 import math
 
+from _jsonio import loads as _loads, dumpb as _dumpb, emit as _emit
+
+# Compiled kernels persist in agent_data so each one-shot CLI run loads them instead
+# of recompiling. numba caches per source file, but cached code is bound to the module
+# name it was compiled under; keep one cache per name this file is loaded as (script,
+# plain import, or ai_hub's loader) so they never read each other's entries
+NUMBA_CACHE_DIR = Path(__file__).parent / 'agent_data' / 'numba_cache' / __name__
+os.environ.setdefault('NUMBA_CACHE_DIR', str(NUMBA_CACHE_DIR))
+
+# numpy and numba are imported on first use rather than here: together they add
+# ~0.3 s to every one-shot run, and tasks like cohort and ab-test need neither.
+# The flags start from whether the packages are installed and drop to False if
+# the import then fails
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+NUMBA_AVAILABLE = NUMPY_AVAILABLE and find_spec('numba') is not None
+np = None
+_JIT_LOADED = False
+
+
+def _load_numpy():
+    """Import numpy into this module on first use; False if it is unavailable"""
+    global np, NUMPY_AVAILABLE
+    if np is None and NUMPY_AVAILABLE:
+        try:
+            import numpy as np
+        except ImportError:
+            NUMPY_AVAILABLE = False
+    return NUMPY_AVAILABLE
+
+
+def _load_jit():
+    """Compile this module's numba kernels on first use; False if numba is unavailable"""
+    global NUMBA_AVAILABLE, _JIT_LOADED
+    global _rfm_score_jit, _rfm_kernel_jit, _forecast_point_jit, _forecast_kernel_jit
+    if _JIT_LOADED or not NUMBA_AVAILABLE:
+        return NUMBA_AVAILABLE
+    
+    try:
+        if not _load_numpy():
+            raise ImportError("numpy is not available")
+        from numba import njit
+    except ImportError:
+        NUMBA_AVAILABLE = False
+        return False
+    
+    if os.environ.get('NUMBA_CACHE_DIR') == str(NUMBA_CACHE_DIR):
+        try:
+            NUMBA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            pass  # Unwritable agent_data: numba still runs, it just can't keep the cache there
+    
+    _rfm_score_jit = njit(cache=True)(_rfm_score)
+    _rfm_kernel_jit = njit(cache=True)(_rfm_kernel)
+    _forecast_point_jit = njit(cache=True)(_forecast_point)
+    _forecast_kernel_jit = njit(cache=True)(_forecast_kernel)
+    _JIT_LOADED = True
+    return True
+
+# ==========================================
+# DATE KEYS
+# ==========================================
+
+# Orders and signups repeat the same timestamps heavily; parse each distinct one once
+
+@lru_cache(maxsize=100_000)
+def _to_month(value):
+    """Return the 'YYYY-MM' key for an ISO timestamp"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m')
+
+
+@lru_cache(maxsize=100_000)
+def _to_day(value):
+    """Return the 'YYYY-MM-DD' key for an ISO timestamp"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+
+
 # ==========================================
 # CUSTOMER ANALYTICS
 # ==========================================
 
+RFM_SEGMENTS = (
+    "Champions",
+    "New Customers",
+    "At Risk",
+    "Lost",
+    "Loyal Customers",
+    "Potential Loyalists"
+)
+
+
+def _rfm_score(recency_days, frequency, monetary):
+    """Score one customer on a 1-5 scale per dimension; returns (R, F, M, segment index)"""
+    if recency_days <= 30:
+        r_score = 5
+    elif recency_days <= 60:
+        r_score = 4
+    elif recency_days <= 90:
+        r_score = 3
+    elif recency_days <= 180:
+        r_score = 2
+    else:
+        r_score = 1
+    
+    f_score = min(5, frequency)
+    
+    if monetary >= 5000:
+        m_score = 5
+    elif monetary >= 2500:
+        m_score = 4
+    elif monetary >= 1000:
+        m_score = 3
+    elif monetary >= 500:
+        m_score = 2
+    else:
+        m_score = 1
+    
+    # Segment classification (index into RFM_SEGMENTS)
+    if r_score >= 4 and f_score >= 4:
+        segment = 0
+    elif r_score >= 4 and f_score <= 2:
+        segment = 1
+    elif r_score <= 2 and f_score >= 4:
+        segment = 2
+    elif r_score <= 2 and f_score <= 2:
+        segment = 3
+    elif r_score >= 3 and f_score >= 3:
+        segment = 4
+    else:
+        segment = 5
+    
+    return r_score, f_score, m_score, segment
+
+
+def _rfm_kernel(recency, frequency, monetary):
+    """_rfm_score over arrays; compiled by _load_jit (it calls the compiled _rfm_score_jit)"""
+    n = recency.shape[0]
+    r = np.empty(n, dtype=np.int8)
+    f = np.empty(n, dtype=np.int8)
+    m = np.empty(n, dtype=np.int8)
+    seg = np.empty(n, dtype=np.int8)
+    for i in range(n):
+        r[i], f[i], m[i], seg[i] = _rfm_score_jit(recency[i], frequency[i], monetary[i])
+    return r, f, m, seg
+
+
 def calculate_rfm_scores(data):
     """
     RFM Analysis (Recency, Frequency, Monetary)
@@ -55,43 +201,38 @@ def calculate_rfm_scores(data):
                 pass
     
     # Calculate RFM scores
-    segments = []
-    for cid, metrics in customer_metrics.items():
+    cids = list(customer_metrics)
+    recencies = []
+    frequencies = []
+    monetaries = []
+    for metrics in customer_metrics.values():
         recency_days = 365
         if metrics['last_order']:
             recency_days = (now - metrics['last_order'].replace(tzinfo=None)).days
-        
-        frequency = len(metrics['orders'])
-        monetary = metrics['total_spent']
-        
-        # Score calculation (1-5 scale)
-        r_score = 5 if recency_days <= 30 else 4 if recency_days <= 60 else 3 if recency_days <= 90 else 2 if recency_days <= 180 else 1
-        f_score = min(5, frequency)
-        m_score = 5 if monetary >= 5000 else 4 if monetary >= 2500 else 3 if monetary >= 1000 else 2 if monetary >= 500 else 1
-        
-        rfm_score = r_score * 100 + f_score * 10 + m_score
-        
-        # Segment classification
-        if r_score >= 4 and f_score >= 4:
-            segment = "Champions"
-        elif r_score >= 4 and f_score <= 2:
-            segment = "New Customers"
-        elif r_score <= 2 and f_score >= 4:
-            segment = "At Risk"
-        elif r_score <= 2 and f_score <= 2:
-            segment = "Lost"
-        elif r_score >= 3 and f_score >= 3:
-            segment = "Loyal Customers"
-        else:
-            segment = "Potential Loyalists"
-        
+        recencies.append(recency_days)
+        frequencies.append(len(metrics['orders']))
+        monetaries.append(metrics['total_spent'])
+    
+    if _load_jit():
+        r_scores, f_scores, m_scores, seg_codes = _rfm_kernel_jit(
+            np.asarray(recencies, dtype=np.int64),
+            np.asarray(frequencies, dtype=np.int64),
+            np.asarray(monetaries, dtype=np.float64)
+        )
+        scores = zip(r_scores.tolist(), f_scores.tolist(), m_scores.tolist(), seg_codes.tolist())
+    else:
+        scores = map(_rfm_score, recencies, frequencies, monetaries)
+    
+    segments = []
+    for cid, recency_days, frequency, monetary, (r_score, f_score, m_score, seg_code) in zip(
+            cids, recencies, frequencies, monetaries, scores):
         segments.append({
             "customerId": cid,
             "recency": recency_days,
             "frequency": frequency,
             "monetary": monetary,
-            "rfmScore": rfm_score,
-            "segment": segment,
+            "rfmScore": r_score * 100 + f_score * 10 + m_score,
+            "segment": RFM_SEGMENTS[seg_code],
             "scores": {"R": r_score, "F": f_score, "M": m_score}
         })
     
@@ -101,7 +242,7 @@ def calculate_rfm_scores(data):
         segment_counts[s['segment']] += 1
     
     return {
-        "segments": sorted(segments, key=lambda x: x['rfmScore'], reverse=True)[:100],
+        "segments": heapq.nlargest(100, segments, key=lambda x: x['rfmScore']),
         "summary": {
             "total_customers": len(segments),
             "segment_distribution": dict(segment_counts),
@@ -127,8 +268,7 @@ def cohort_analysis(data):
         created = user.get('createdAt') or user.get('signupDate')
         if created:
             try:
-                date = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                cohort_key = date.strftime('%Y-%m')
+                cohort_key = _to_month(created)
                 uid = user.get('id') or user.get('email')
                 if uid:
                     user_cohorts[uid] = cohort_key
@@ -143,8 +283,7 @@ def cohort_analysis(data):
         
         if uid in user_cohorts and order_date:
             try:
-                date = datetime.fromisoformat(order_date.replace('Z', '+00:00'))
-                order_month = date.strftime('%Y-%m')
+                order_month = _to_month(order_date)
                 cohort_orders[user_cohorts[uid]][order_month].add(uid)
             except:
                 pass
@@ -153,8 +292,10 @@ def cohort_analysis(data):
     cohorts = sorted(cohort_orders.keys())
     retention_matrix = []
     
+    cohort_sizes = Counter(user_cohorts.values())
+    
     for cohort in cohorts[-6:]:  # Last 6 cohorts
-        cohort_size = len([u for u, c in user_cohorts.items() if c == cohort])
+        cohort_size = cohort_sizes[cohort]
         row = {"cohort": cohort, "size": cohort_size, "retention": []}
         
         for i, month in enumerate(sorted(cohort_orders[cohort].keys())[:6]):
@@ -178,6 +319,35 @@ def cohort_analysis(data):
 # SALES ANALYTICS
 # ==========================================
 
+def _forecast_point(base, daily_growth, step, weekday):
+    """Projected sales `step` days ahead, damped on weekends (weekday 5-6)"""
+    predicted = base * (daily_growth ** step)
+    
+    # Add some variance for weekends
+    if weekday >= 5:
+        predicted *= 0.85  # Lower weekend sales
+    
+    return predicted
+
+
+def _forecast_kernel(base, daily_growth, days_ahead, start_weekday):
+    """_forecast_point for each day ahead; compiled by _load_jit"""
+    predicted = np.empty(days_ahead, dtype=np.float64)
+    for i in range(days_ahead):
+        predicted[i] = _forecast_point_jit(base, daily_growth, i + 1, (start_weekday + i + 1) % 7)
+    return predicted
+
+
+def warm_jit():
+    """Compile (or load from numba's on-disk cache) the kernels used by this engine"""
+    if not _load_jit():
+        return {"numba": False, "kernels": []}
+    
+    _rfm_kernel_jit(np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64), np.zeros(1, dtype=np.float64))
+    _forecast_kernel_jit(1.0, 1.0, 1, 0)
+    return {"numba": True, "kernels": ["rfm", "forecast"]}
+
+
 def sales_forecasting(data):
     """
     Simple time-series forecasting using moving averages
@@ -188,23 +358,38 @@ def sales_forecasting(data):
     if not orders:
         return {"forecast": [], "trend": "stable", "confidence": 0}
     
-    # Aggregate daily sales
-    daily_sales = defaultdict(float)
+    # Aggregate daily sales: map each distinct timestamp to a day slot once,
+    # then sum the amounts per slot in order
+    day_index = {}
+    slot_of = {}
+    day_idx = []
+    amounts = []
     for order in orders:
         order_date = order.get('createdAt') or order.get('date')
         amount = float(order.get('total', 0) or order.get('amount', 0))
         
         if order_date:
             try:
-                date = datetime.fromisoformat(order_date.replace('Z', '+00:00'))
-                day_key = date.strftime('%Y-%m-%d')
-                daily_sales[day_key] += amount
+                slot = slot_of.get(order_date)
+                if slot is None:
+                    slot = slot_of[order_date] = day_index.setdefault(_to_day(order_date), len(day_index))
             except:
-                pass
+                continue
+            day_idx.append(slot)
+            amounts.append(amount)
     
-    if not daily_sales:
+    if not day_index:
         return {"forecast": [], "trend": "stable", "confidence": 0}
     
+    if _load_numpy():
+        totals = np.bincount(np.asarray(day_idx, dtype=np.int32), weights=np.asarray(amounts, dtype=np.float64),
+                             minlength=len(day_index)).tolist()
+    else:
+        totals = [0.0] * len(day_index)
+        for slot, amount in zip(day_idx, amounts):
+            totals[slot] += amount
+    daily_sales = dict(zip(day_index, totals))
+    
     # Sort by date and get recent data
     sorted_days = sorted(daily_sales.keys())[-30:]  # Last 30 days
     values = [daily_sales[d] for d in sorted_days]
@@ -230,14 +415,16 @@ def sales_forecasting(data):
     base = ma_7
     daily_growth = 1 + (growth_rate / 100 / 7)
     
-    for i in range(days_ahead):
-        future_date = datetime.now() + timedelta(days=i+1)
-        predicted = base * (daily_growth ** (i+1))
-        
-        # Add some variance for weekends
-        if future_date.weekday() >= 5:
-            predicted *= 0.85  # Lower weekend sales
-        
+    today = datetime.now()
+    start_weekday = today.weekday()
+    if _load_jit():
+        predictions = _forecast_kernel_jit(float(base), float(daily_growth), max(days_ahead, 0), start_weekday).tolist()
+    else:
+        predictions = [_forecast_point(base, daily_growth, i + 1, (start_weekday + i + 1) % 7)
+                       for i in range(days_ahead)]
+    
+    for i, predicted in enumerate(predictions):
+        future_date = today + timedelta(days=i+1)
         forecast.append({
             "date": future_date.strftime('%Y-%m-%d'),
             "predicted": round(predicted, 2),
@@ -266,49 +453,73 @@ def product_performance(data):
     products = data.get('products', [])
     orders = data.get('orders', [])
     
-    product_stats = defaultdict(lambda: {
-        'sold': 0, 'revenue': 0, 'views': 0, 'cart_adds': 0
-    })
-    
+    # Flatten line items, numbering products in first-seen order
+    product_index = {}
+    pid_idx = []
+    qty_list = []
+    price_list = []
     for order in orders:
         items = order.get('items', [])
         for item in items:
             pid = item.get('productId') or item.get('id')
             if pid:
-                product_stats[pid]['sold'] += item.get('quantity', 1)
-                product_stats[pid]['revenue'] += float(item.get('price', 0)) * item.get('quantity', 1)
+                pid_idx.append(product_index.setdefault(pid, len(product_index)))
+                qty_list.append(item.get('quantity', 1))
+                price_list.append(float(item.get('price', 0)))
+    
+    n_products = len(product_index)
+    if pid_idx and _load_numpy():
+        idx = np.asarray(pid_idx, dtype=np.int32)
+        qty = np.asarray(qty_list)
+        sold = np.bincount(idx, weights=qty, minlength=n_products)
+        if qty.dtype.kind in 'iu':
+            sold = sold.astype(np.int64)
+        sold = sold.tolist()
+        revenue = np.bincount(idx, weights=qty * np.asarray(price_list), minlength=n_products).tolist()
+    else:
+        sold = [0] * n_products
+        revenue = [0] * n_products
+        for i, q, price in zip(pid_idx, qty_list, price_list):
+            sold[i] += q
+            revenue[i] += price * q
     
     # Enrich with product details
     product_map = {p.get('id'): p for p in products}
+    views = 0  # not tracked in order data
     
     performance = []
-    for pid, stats in product_stats.items():
+    for pid, i in product_index.items():
         product = product_map.get(pid, {})
+        units = sold[i]
+        rev = revenue[i]
         
         # Calculate metrics
-        conversion_rate = (stats['sold'] / stats['views'] * 100) if stats['views'] > 0 else 0
+        conversion_rate = (units / views * 100) if views > 0 else 0
         
         performance.append({
             "productId": pid,
             "name": product.get('name', 'Unknown'),
             "category": product.get('category', 'Unknown'),
-            "unitsSold": stats['sold'],
-            "revenue": round(stats['revenue'], 2),
+            "unitsSold": units,
+            "revenue": round(rev, 2),
             "conversionRate": round(conversion_rate, 2),
-            "avgOrderValue": round(stats['revenue'] / stats['sold'], 2) if stats['sold'] > 0 else 0,
+            "avgOrderValue": round(rev / units, 2) if units > 0 else 0,
             "stockLevel": product.get('stock', 0),
-            "performanceScore": min(100, stats['sold'] * 10 + stats['revenue'] / 100)
+            "performanceScore": min(100, units * 10 + rev / 100)
         })
     
-    # Sort by performance
-    performance.sort(key=lambda x: x['performanceScore'], reverse=True)
+    # Only the ends of the ranking are reported, so select them instead of sorting;
+    # ties rank in first-seen order as with a stable sort
+    top = heapq.nlargest(20, performance, key=lambda x: x['performanceScore'])
+    slow = [p for p in performance if p['unitsSold'] < 2]
+    bottom = heapq.nsmallest(5, range(len(slow)), key=lambda i: (slow[i]['performanceScore'], -i))
     
     return {
-        "products": performance[:20],
-        "top_sellers": performance[:5],
-        "underperformers": [p for p in performance if p['unitsSold'] < 2][-5:],
+        "products": top,
+        "top_sellers": top[:5],
+        "underperformers": [slow[i] for i in reversed(bottom)],
         "total_products_sold": sum(p['unitsSold'] for p in performance),
-        "total_revenue": sum(p['revenue'] for p in performance)
+        "total_revenue": round(sum(p['revenue'] for p in performance), 2)
     }
 
 
@@ -341,8 +552,10 @@ def ab_test_analysis(data):
     lift = ((rate_b - rate_a) / rate_a * 100) if rate_a > 0 else 0
     
     # Simple z-test for statistical significance
-    pooled_rate = (conversions_a + conversions_b) / (visitors_a + visitors_b)
-    se = math.sqrt(pooled_rate * (1 - pooled_rate) * (1/visitors_a + 1/visitors_b))
+    total_visitors = visitors_a + visitors_b
+    pooled_rate = (conversions_a + conversions_b) / total_visitors
+    pooled_variance = pooled_rate * (1 - pooled_rate)
+    se = math.sqrt(pooled_variance * (1/visitors_a + 1/visitors_b))
     
     z_score = (rate_b - rate_a) / se if se > 0 else 0
     
@@ -376,8 +589,8 @@ def ab_test_analysis(data):
             "recommendation": f"Variant {winner} shows a {abs(lift):.1f}% {'improvement' if lift > 0 else 'decrease'}" if is_significant else "Continue testing - need more data"
         },
         "sampleSize": {
-            "current": visitors_a + visitors_b,
-            "recommended": int(16 * pooled_rate * (1 - pooled_rate) / (0.01 ** 2)) if pooled_rate > 0 else 1000
+            "current": total_visitors,
+            "recommended": int(16 * pooled_variance / (0.01 ** 2)) if pooled_rate > 0 else 1000
         }
     }
 
@@ -393,28 +606,30 @@ if __name__ == "__main__":
             input_data = {}
             if len(sys.argv) > 2:
                 if sys.argv[2] == "--stdin":
-                    input_data = json.loads(sys.stdin.read())
+                    input_data = _loads(sys.stdin.buffer.read())
                 else:
-                    input_data = json.loads(sys.argv[2])
+                    input_data = _loads(sys.argv[2])
             
             if not isinstance(input_data, dict):
                 input_data = {"data": input_data}
             
             if task == "rfm":
-                print(json.dumps(calculate_rfm_scores(input_data)))
+                _emit(calculate_rfm_scores(input_data))
             elif task == "cohort":
-                print(json.dumps(cohort_analysis(input_data)))
+                _emit(cohort_analysis(input_data))
             elif task == "forecast":
-                print(json.dumps(sales_forecasting(input_data)))
+                _emit(sales_forecasting(input_data))
             elif task == "product-performance":
-                print(json.dumps(product_performance(input_data)))
+                _emit(product_performance(input_data))
             elif task == "ab-test":
-                print(json.dumps(ab_test_analysis(input_data)))
+                _emit(ab_test_analysis(input_data))
+            elif task == "warm":
+                _emit(warm_jit())
             elif task == "status" or task == "health":
-                print(json.dumps({"status": "healthy", "version": "1.0.0"}))
+                _emit({"status": "healthy", "version": "1.0.0"})
             else:
-                print(json.dumps({"error": f"Unknown task: {task}"}))
+                _emit({"error": f"Unknown task: {task}"})
         except Exception as e:
-            print(json.dumps({"error": str(e)}))
+            _emit({"error": str(e)})
     else:
-        print(json.dumps({"status": "healthy", "engine": "Analytics Engine v1.0"}))
+        _emit({"status": "healthy", "engine": "Analytics Engine v1.0"})
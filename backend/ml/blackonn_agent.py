@@ -25,6 +25,7 @@ Usage:
 """
 
 import os
+import posixpath
 import sys
 import json
 import re
@@ -33,15 +34,31 @@ import subprocess
 import hashlib
 import traceback
 import difflib
+import fnmatch
+import codecs
+import locale
+import bisect
+import mmap
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple, Set
-from dataclasses import dataclass, field, asdict
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Any, Tuple, Set, ClassVar, Iterator, Union
+from dataclasses import dataclass, field
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, deque
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import itertools
+import multiprocessing
 import threading
 import shutil
 
+# File locking for the append-only fix history (POSIX only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # Optional Flask for API mode
 try:
     from flask import Flask, request, jsonify
@@ -50,6 +67,41 @@ try:
 except ImportError:
     FLASK_AVAILABLE = False
 
+# Optional waitress to serve API mode with a thread pool (falls back to Flask's dev server)
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
+# Optional orjson for fast JSON validation
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional ijson (yajl) to validate large JSON files without loading them
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# Optional RapidFuzz (C++) to rule out dissimilar learned fixes before difflib
+try:
+    from rapidfuzz import fuzz as rapidfuzz_fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Optional Hyperscan for single-pass multi-pattern error matching
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -67,7 +119,10 @@ class AgentConfig:
     
     # Agent Memory Files
     MEMORY_FILE = AGENT_DIR / "agent_memory.json"
-    FIX_HISTORY_FILE = AGENT_DIR / "fix_history.json"
+    FIX_HISTORY_FILE = AGENT_DIR / "fix_history.jsonl"
+    LEGACY_FIX_HISTORY_FILE = AGENT_DIR / "fix_history.json"
+    FIX_HISTORY_LIMIT = 500
+    FIX_HISTORY_ROTATE_BYTES = 1024 * 1024
     PATTERNS_FILE = AGENT_DIR / "learned_patterns.json"
     
     # Behavior
@@ -75,10 +130,23 @@ class AgentConfig:
     MAX_FIX_ATTEMPTS = 3
     MIN_CONFIDENCE = 0.5
     MAX_FILE_SIZE_KB = 500
+    MMAP_MIN_BYTES = 256 * 1024
+    JSON_STREAM_MIN_BYTES = 8 * 1024 * 1024
+    SYNTAX_CHECK_WORKERS = min(32, (os.cpu_count() or 4) * 2)
+    SYNTAX_CACHE_LIMIT = 5000
+    # Static analysis moves to a process pool only above this much source (pool IPC
+    # costs more than scanning a few hundred KB inline)
+    ANALYSIS_POOL_MIN_BYTES = 1024 * 1024
     
     # Monitoring
     MONITOR_INTERVAL = 30
+    SEEN_ERRORS_LIMIT = 500
+    MEMORY_FLUSH_INTERVAL = 5.0
+    
+    # API server
+    API_THREADS = 8
     ERROR_LOG_PATH = LOGS_DIR / "client-errors.json"
+    CLIENT_LOG_TAIL = 50
     
     # File patterns
     JS_EXTENSIONS = {'.js', '.mjs', '.jsx'}
@@ -97,6 +165,9 @@ AgentConfig.AGENT_DIR.mkdir(parents=True, exist_ok=True)
 # DATA STRUCTURES
 # ============================================================================
 
+# slots=True needs Python 3.10; older interpreters keep the per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 class Severity(Enum):
     LOW = "low"
     MEDIUM = "medium"
@@ -109,7 +180,7 @@ class FixStatus(Enum):
     FAILED = "failed"
     SKIPPED = "skipped"
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Error:
     """Detected error"""
     id: str
@@ -123,8 +194,16 @@ class Error:
     context: Dict = field(default_factory=dict)
     severity: Severity = Severity.MEDIUM
     status: FixStatus = FixStatus.PENDING
+    
+    def to_dict(self) -> Dict:
+        """Same dict as dataclasses.asdict(self), without its per-field reflection and deepcopy"""
+        return {
+            'id': self.id, 'timestamp': self.timestamp, 'type': self.type, 'message': self.message,
+            'file_path': self.file_path, 'line': self.line, 'column': self.column, 'stack': self.stack,
+            'context': dict(self.context), 'severity': self.severity, 'status': self.status,
+        }
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Fix:
     """Code fix"""
     id: str
@@ -138,8 +217,17 @@ class Fix:
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
     applied: bool = False
     verified: bool = False
+    
+    def to_dict(self) -> Dict:
+        """Same dict as dataclasses.asdict(self)"""
+        return {
+            'id': self.id, 'error_id': self.error_id, 'file_path': self.file_path,
+            'original': self.original, 'fixed': self.fixed, 'explanation': self.explanation,
+            'confidence': self.confidence, 'pattern_used': self.pattern_used,
+            'timestamp': self.timestamp, 'applied': self.applied, 'verified': self.verified,
+        }
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Action:
     """Agent action log"""
     id: str
@@ -149,11 +237,102 @@ class Action:
     description: str
     success: bool
     details: Dict = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict:
+        """Same dict as dataclasses.asdict(self)"""
+        return {
+            'id': self.id, 'timestamp': self.timestamp, 'type': self.type, 'target': self.target,
+            'description': self.description, 'success': self.success, 'details': dict(self.details),
+        }
+
+# ============================================================================
+# JSON HELPERS
+# ============================================================================
+
+if ORJSON_AVAILABLE:
+    def _loads(data: bytes) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity and integers beyond 64 bits are only accepted by stdlib json
+            return json.loads(data)
+    
+    def _dumpb(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            return (json.dumps(obj) + '\n').encode()
+    
+    def _dumpb_indent(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            return json.dumps(obj, indent=2).encode()
+else:
+    _loads = json.loads
+    
+    def _dumpb(obj: Any) -> bytes:
+        return (json.dumps(obj) + '\n').encode()
+    
+    def _dumpb_indent(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# read_text() decodes with the locale encoding; orjson only reads UTF-8
+_TEXT_IS_UTF8 = codecs.lookup(locale.getpreferredencoding(False)).name == 'utf-8'
+
+
+def _check_json_file(path: Path):
+    """Raise exactly what json.loads(path.read_text()) would, letting ijson (large files)
+    or orjson vouch for valid ones"""
+    if _TEXT_IS_UTF8:
+        if IJSON_AVAILABLE and path.stat().st_size >= AgentConfig.JSON_STREAM_MIN_BYTES:
+            if _stream_json_ok(path):
+                return
+        elif ORJSON_AVAILABLE:
+            try:
+                orjson.loads(path.read_bytes())
+                return
+            except orjson.JSONDecodeError:
+                pass
+    # stdlib re-parse for its verdict, message and line
+    json.loads(path.read_text())
+
+
+def _stream_json_ok(path: Path) -> bool:
+    """Validate a JSON file with ijson in constant memory; False leaves the verdict to json"""
+    with _source_bytes(path) as data:
+        # yajl also accepts \v and \f as whitespace, json does not
+        if data.find(b'\x0b') != -1 or data.find(b'\x0c') != -1:
+            return False
+    try:
+        with open(path, 'rb') as f:
+            for _ in ijson.basic_parse(f):
+                pass
+        return True
+    except Exception:
+        return False
 
 # ============================================================================
 # PATTERN ENGINE - THE BRAIN (NO API NEEDED)
 # ============================================================================
 
+def _line_starts(content: Union[str, bytes, mmap.mmap], count: int, newline: Union[str, bytes] = '\n') -> List[int]:
+    """Start offsets of the first `count` lines of content (fewer if it is shorter)"""
+    starts = [0]
+    pos = content.find(newline)
+    while pos != -1 and len(starts) < count:
+        starts.append(pos + 1)
+        pos = content.find(newline, pos + 1)
+    return starts
+
+
+@lru_cache(maxsize=256)
+def _compile_var_pattern(pattern: str, var_name: Optional[str]) -> re.Pattern:
+    """Compile a {VAR} fix-template pattern for one variable name"""
+    if var_name:
+        pattern = pattern.replace('{VAR}', re.escape(var_name))
+    return re.compile(pattern)
+
 class PatternEngine:
     """
     Rule-based pattern matching engine for error detection and fixing.
@@ -161,14 +340,53 @@ class PatternEngine:
     NO EXTERNAL API REQUIRED.
     """
     
+    # Root cause, fix strategies and base confidence per error category
+    CATEGORY_STRATEGIES: ClassVar[Dict[str, Tuple[str, Tuple[str, ...], float]]] = {
+        'null_reference': ('Attempting to access property of null/undefined value',
+                           ('optional_chaining', 'null_check_before_access', 'default_value'), 0.85),
+        'reference': ('Variable or function used before declaration',
+                      ('typeof_check', 'define_missing_variable'), 0.70),
+        'type': ('Type mismatch or invalid operation on type',
+                 ('array_check', 'empty_array_default'), 0.75),
+        'syntax': ('Syntax error in code structure',
+                   ('missing_semicolon', 'missing_bracket'), 0.60),
+        'async': ('Async/await usage error',
+                  ('add_async', 'wrap_try_catch'), 0.75),
+        'dom': ('DOM element access before ready or missing',
+                ('element_exists_check', 'dom_ready_check'), 0.80),
+        'json': ('Invalid JSON syntax',
+                 ('fix_json_trailing_comma', 'fix_json_quotes'), 0.90),
+    }
+    
     def __init__(self):
         self.patterns = self._load_patterns()
         self.fix_templates = self._load_fix_templates()
         self.learned_fixes = self._load_learned_fixes()
+        self._learned_lower: List[str] = []
+        
+        # Fix ids: one timestamp per engine plus a counter, so fixes generated
+        # within the same millisecond no longer share an id
+        self._session_id = int(time.time() * 1000)
+        self._fix_counter = itertools.count(1)
+        
+        # Error streams repeat the same messages; analysis depends only on the message
+        # and the learned fixes, so results are cached per (message, learned version)
+        self._learned_version = 0
+        self._analyze_message = lru_cache(maxsize=1024)(self._analyze_message_uncached)
+        
+        # Flat (pattern_type, pattern) list; its positions are the Hyperscan ids
+        self._pattern_index = [
+            (pattern_type, pattern)
+            for pattern_type, patterns in self.patterns.items()
+            for pattern in patterns
+        ]
+        self._hs_db = self._build_hyperscan_db()
+        self._hs_local = threading.local()
+        self._prefix_trie, self._unprefixed = self._build_prefix_trie()
     
     def _load_patterns(self) -> Dict[str, List[Dict]]:
         """Load error detection patterns - THE KNOWLEDGE BASE"""
-        return {
+        patterns = {
             # ============ JAVASCRIPT ERRORS ============
             'undefined_variable': [
                 {'regex': r"(\w+) is not defined", 'severity': 'high', 'category': 'reference'},
@@ -235,10 +453,16 @@ class PatternEngine:
                 {'regex': r"SyntaxError.*JSON", 'severity': 'high', 'category': 'json'},
             ],
         }
+        
+        # Compile once here instead of on every analyze_error call
+        for group in patterns.values():
+            for pattern in group:
+                pattern['compiled'] = re.compile(pattern['regex'], re.IGNORECASE)
+        return patterns
     
     def _load_fix_templates(self) -> Dict[str, Dict]:
         """Load fix templates - THE REPAIR STRATEGIES"""
-        return {
+        templates = {
             # ============ NULL/UNDEFINED FIXES ============
             'null_check_before_access': {
                 'description': 'Add null check before property access',
@@ -358,21 +582,186 @@ class PatternEngine:
                 'applies_to': ['json']
             },
         }
+        
+        # {VAR} templates depend on the error and are compiled per variable name
+        for template in templates.values():
+            if '{VAR}' not in template['pattern']:
+                template['_compiled'] = re.compile(template['pattern'])
+        return templates
+    
+    def _build_hyperscan_db(self) -> Optional[Any]:
+        """Compile every error pattern into one Hyperscan database, or None to use the regex loop"""
+        if not HYPERSCAN_AVAILABLE:
+            return None
+        try:
+            flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern['regex'].encode() for _, pattern in self._pattern_index],
+                ids=list(range(len(self._pattern_index))),
+                elements=len(self._pattern_index),
+                flags=[flags] * len(self._pattern_index)
+            )
+            return db
+        except Exception as e:
+            print(f"[AGENT] Hyperscan unavailable, using regex loop: {e}")
+            return None
+    
+    @staticmethod
+    def _literal_prefix(regex: str) -> str:
+        """Leading literal text every match of regex must start with ('' if none)"""
+        # A top-level alternative means no single literal is required
+        depth = 0
+        escaped = in_class = False
+        for ch in regex:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif in_class:
+                in_class = ch != ']'
+            elif ch == '[':
+                in_class = True
+            elif ch == '(':
+                depth += 1
+            elif ch == ')':
+                depth -= 1
+            elif ch == '|' and depth == 0:
+                return ''
+        
+        prefix = []
+        for ch in regex:
+            if ch in '\\()[].+^$|':
+                break
+            if ch in '?*{':
+                # The preceding character is optional or repeated a variable number of times
+                prefix = prefix[:-1]
+                break
+            prefix.append(ch)
+        return ''.join(prefix)
+    
+    def _build_prefix_trie(self) -> Tuple[Dict, List[int]]:
+        """Character trie over lowercased literal prefixes of the error patterns.
+        
+        Leaves (key None) hold pattern positions in _pattern_index; patterns whose
+        prefix is shorter than 4 characters are returned separately and always tried.
+        """
+        trie = {}
+        unprefixed = []
+        for i, (_, pattern) in enumerate(self._pattern_index):
+            prefix = self._literal_prefix(pattern['regex']).lower()
+            if len(prefix) < 4:
+                unprefixed.append(i)
+                continue
+            node = trie
+            for ch in prefix:
+                node = node.setdefault(ch, {})
+            node.setdefault(None, []).append(i)
+        return trie, unprefixed
+    
+    def _trie_candidates(self, message: str) -> List[Tuple[str, Dict]]:
+        """Patterns whose literal prefix occurs somewhere in message, in table order"""
+        # Unicode case folding can match non-ASCII text against ASCII literals
+        # (e.g. the Kelvin sign against 'k'), so only ASCII messages are pruned
+        if not message.isascii():
+            return self._pattern_index
+        
+        text = message.lower()
+        trie = self._prefix_trie
+        found = set(self._unprefixed)
+        for start in range(len(text)):
+            node = trie.get(text[start])
+            pos = start + 1
+            while node is not None:
+                leaves = node.get(None)
+                if leaves:
+                    found.update(leaves)
+                if pos == len(text):
+                    break
+                node = node.get(text[pos])
+                pos += 1
+        return [self._pattern_index[i] for i in sorted(found)]
+    
+    def _candidate_patterns(self, message: str) -> List[Tuple[str, Dict]]:
+        """Patterns that can match message, in table order"""
+        if self._hs_db is None:
+            return self._trie_candidates(message)
+        try:
+            data = message.encode('utf-8')
+        except UnicodeEncodeError:
+            return self._pattern_index
+        
+        # Scratch space is per thread; the API server and monitor loop may scan concurrently
+        scratch = getattr(self._hs_local, 'scratch', None)
+        if scratch is None:
+            scratch = self._hs_local.scratch = hyperscan.Scratch(self._hs_db)
+        
+        hits = []
+        self._hs_db.scan(data, match_event_handler=lambda pid, start, end, flags, ctx: hits.append(pid), scratch=scratch)
+        return [self._pattern_index[i] for i in sorted(hits)]
     
     def _load_learned_fixes(self) -> List[Dict]:
         """Load fixes learned from past successful repairs"""
+        return [f for f in self._iter_fix_history() if f.get('verified')]
+    
+    def _iter_fix_history(self) -> Iterator[Dict]:
+        """Yield fix history entries, oldest first (legacy JSON array, then JSONL lines); non-dict entries are skipped"""
+        data = None
         try:
-            if AgentConfig.FIX_HISTORY_FILE.exists():
-                data = json.loads(AgentConfig.FIX_HISTORY_FILE.read_text())
-                return [f for f in data if f.get('verified')]
-        except:
+            if AgentConfig.LEGACY_FIX_HISTORY_FILE.exists():
+                data = _loads(AgentConfig.LEGACY_FIX_HISTORY_FILE.read_bytes().removeprefix(codecs.BOM_UTF8))
+        except Exception:
+            pass
+        if isinstance(data, list):
+            for entry in data:
+                if isinstance(entry, dict):
+                    yield entry
+        
+        try:
+            with open(AgentConfig.FIX_HISTORY_FILE, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = _loads(line)
+                    except ValueError:
+                        continue  # partially written line
+                    if isinstance(entry, dict):
+                        yield entry
+        except OSError:
             pass
-        return []
+    
+    def _append_fix_history(self, entry: Dict):
+        """Append one entry to the JSONL fix history, rotating to the last FIX_HISTORY_LIMIT when it grows large"""
+        path = AgentConfig.FIX_HISTORY_FILE
+        line = _dumpb(entry)
+        while True:
+            with open(path, 'ab') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    # Another writer may have rotated the file while we waited for the lock
+                    if os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                        continue
+                f.write(line)
+                f.flush()
+                if f.tell() > AgentConfig.FIX_HISTORY_ROTATE_BYTES:
+                    lines = path.read_bytes().splitlines(keepends=True)
+                    tmp = path.with_suffix('.jsonl.tmp')
+                    tmp.write_bytes(b''.join(lines[-AgentConfig.FIX_HISTORY_LIMIT:]))
+                    os.replace(tmp, path)
+                return
     
     def analyze_error(self, error: Error) -> Dict:
         """Analyze error and determine fix strategy - THE BRAIN"""
+        cached = self._analyze_message(error.message, self._learned_version)
+        
+        # Callers may mutate the result; copy the containers, not the shared learned fix
+        analysis = {'error_id': error.id, **cached}
+        analysis['patterns_matched'] = [dict(m) for m in cached['patterns_matched']]
+        analysis['fix_strategies'] = list(cached['fix_strategies'])
+        return analysis
+    
+    def _analyze_message_uncached(self, message: str, learned_version: int) -> Dict:
+        """Pattern and learned-fix analysis of one error message (cached via _analyze_message)"""
         analysis = {
-            'error_id': error.id,
             'patterns_matched': [],
             'category': 'unknown',
             'root_cause': 'Unable to determine',
@@ -381,60 +770,31 @@ class PatternEngine:
             'confidence': 0.0
         }
         
-        # Match against all patterns
-        for pattern_type, patterns in self.patterns.items():
-            for pattern in patterns:
-                match = re.search(pattern['regex'], error.message, re.IGNORECASE)
-                if match:
-                    analysis['patterns_matched'].append({
-                        'type': pattern_type,
-                        'match': match.group(0),
-                        'groups': match.groups(),
-                        'category': pattern['category'],
-                        'severity': pattern['severity']
-                    })
-                    analysis['category'] = pattern['category']
-                    analysis['can_fix'] = True
+        # Match against all patterns (Hyperscan narrows this to the ones that hit;
+        # the regex is still run on those for the match text and groups)
+        for pattern_type, pattern in self._candidate_patterns(message):
+            match = pattern['compiled'].search(message)
+            if match:
+                analysis['patterns_matched'].append({
+                    'type': pattern_type,
+                    'match': match.group(0),
+                    'groups': match.groups(),
+                    'category': pattern['category'],
+                    'severity': pattern['severity']
+                })
+                analysis['category'] = pattern['category']
+                analysis['can_fix'] = True
         
         # Determine root cause and strategies based on category
-        if analysis['category'] == 'null_reference':
-            analysis['root_cause'] = 'Attempting to access property of null/undefined value'
-            analysis['fix_strategies'] = ['optional_chaining', 'null_check_before_access', 'default_value']
-            analysis['confidence'] = 0.85
-        
-        elif analysis['category'] == 'reference':
-            analysis['root_cause'] = 'Variable or function used before declaration'
-            analysis['fix_strategies'] = ['typeof_check', 'define_missing_variable']
-            analysis['confidence'] = 0.70
-        
-        elif analysis['category'] == 'type':
-            analysis['root_cause'] = 'Type mismatch or invalid operation on type'
-            analysis['fix_strategies'] = ['array_check', 'empty_array_default']
-            analysis['confidence'] = 0.75
-        
-        elif analysis['category'] == 'syntax':
-            analysis['root_cause'] = 'Syntax error in code structure'
-            analysis['fix_strategies'] = ['missing_semicolon', 'missing_bracket']
-            analysis['confidence'] = 0.60
-        
-        elif analysis['category'] == 'async':
-            analysis['root_cause'] = 'Async/await usage error'
-            analysis['fix_strategies'] = ['add_async', 'wrap_try_catch']
-            analysis['confidence'] = 0.75
-        
-        elif analysis['category'] == 'dom':
-            analysis['root_cause'] = 'DOM element access before ready or missing'
-            analysis['fix_strategies'] = ['element_exists_check', 'dom_ready_check']
-            analysis['confidence'] = 0.80
-        
-        elif analysis['category'] == 'json':
-            analysis['root_cause'] = 'Invalid JSON syntax'
-            analysis['fix_strategies'] = ['fix_json_trailing_comma', 'fix_json_quotes']
-            analysis['confidence'] = 0.90
+        strategy = self.CATEGORY_STRATEGIES.get(analysis['category'])
+        if strategy:
+            analysis['root_cause'], fix_strategies, analysis['confidence'] = strategy
+            analysis['fix_strategies'] = list(fix_strategies)
         
         # Check learned fixes for similar errors
-        for learned in self.learned_fixes:
-            if self._similarity(error.message, learned.get('error_message', '')) > 0.7:
+        msg_lower = message.lower()
+        for learned, learned_lower in zip(self.learned_fixes, self._learned_messages_lower()):
+            if self._is_similar_lower(msg_lower, learned_lower, 0.7):
                 analysis['learned_fix_available'] = True
                 analysis['learned_fix'] = learned
                 analysis['confidence'] = min(0.95, analysis['confidence'] + 0.15)
@@ -447,13 +807,22 @@ class PatternEngine:
         if not analysis['can_fix'] or not analysis['fix_strategies']:
             return None
         
+        # The {VAR} name and the error line's offsets are the same for every strategy
+        var_name = self._template_var(analysis)
+        try:
+            window = self._error_window(file_content, error.line)
+            strategies = analysis['fix_strategies']
+        except Exception as e:
+            print(f"[AGENT] Fix template error: {e}")
+            strategies = []
+        
         # Try each strategy
-        for strategy_name in analysis['fix_strategies']:
+        for strategy_name in strategies:
             template = self.fix_templates.get(strategy_name)
             if not template:
                 continue
             
-            fix = self._apply_fix_template(error, file_content, template, analysis)
+            fix = self._apply_fix_template(error, file_content, template, var_name, window)
             if fix:
                 fix.pattern_used = strategy_name
                 return fix
@@ -463,7 +832,7 @@ class PatternEngine:
             learned = analysis['learned_fix']
             if learned.get('original') in file_content:
                 return Fix(
-                    id=f"fix_{int(time.time()*1000)}",
+                    id=self._next_fix_id(),
                     error_id=error.id,
                     file_path=error.file_path or '',
                     original=learned['original'],
@@ -475,68 +844,88 @@ class PatternEngine:
         
         return None
     
-    def _apply_fix_template(self, error: Error, content: str, template: Dict, analysis: Dict) -> Optional[Fix]:
-        """Apply a fix template to generate actual fix"""
+    def _next_fix_id(self) -> str:
+        """Unique, increasing id for a generated fix"""
+        return f"fix_{self._session_id}_{next(self._fix_counter)}"
+    
+    @staticmethod
+    def _template_var(analysis: Dict) -> Optional[str]:
+        """Variable name for {VAR} templates: first capture group of the first matched pattern that has one"""
+        for match_info in analysis.get('patterns_matched', []):
+            groups = match_info.get('groups', ())
+            if groups:
+                return groups[0]
+        return None
+    
+    @staticmethod
+    def _error_window(content: str, line: Optional[int]) -> Optional[Tuple[int, int, int, int]]:
+        """(line start, line stop, section start, section stop) offsets for the error line and
+        two lines of context either side, or None when there is no such line"""
+        if not line or line <= 0:
+            return None
+        
+        # Offsets of the lines up to two past the error line, enough for the context window
+        starts = _line_starts(content, line + 3)
+        if line > len(starts):
+            return None
+        
+        def line_end(index: int) -> int:
+            return starts[index + 1] - 1 if index + 1 < len(starts) else len(content)
+        
+        start = max(0, line - 3)
+        end = min(len(starts), line + 2)
+        return starts[line - 1], line_end(line - 1), starts[start], line_end(end - 1)
+    
+    def _apply_fix_template(self, error: Error, content: str, template: Dict,
+                            var_name: Optional[str], window: Optional[Tuple[int, int, int, int]]) -> Optional[Fix]:
+        """Apply a fix template to generate actual fix (var_name and window from generate_fix)"""
         try:
-            pattern = template['pattern']
+            pattern = template.get('_compiled')
             replacement = template['replacement']
             
-            # Extract variable names from error
-            var_name = None
-            for match_info in analysis.get('patterns_matched', []):
-                groups = match_info.get('groups', ())
-                if groups:
-                    var_name = groups[0]
-                    break
-            
             # Substitute variable placeholders
-            if var_name and '{VAR}' in pattern:
-                pattern = pattern.replace('{VAR}', re.escape(var_name))
-                replacement = replacement.replace('{VAR}', var_name)
+            if pattern is None:
+                pattern = _compile_var_pattern(template['pattern'], var_name)
+                if var_name:
+                    replacement = replacement.replace('{VAR}', var_name)
             
             # Find line with error
-            if error.line and error.line > 0:
-                lines = content.split('\n')
-                if error.line <= len(lines):
-                    error_line = lines[error.line - 1]
+            if window:
+                line_start, line_stop, section_start, section_stop = window
+                error_line = content[line_start:line_stop]
+                
+                # Try to match and fix the specific line
+                match = pattern.search(error_line)
+                if match:
+                    fixed_line = pattern.sub(replacement, error_line, count=1)
                     
-                    # Try to match and fix the specific line
-                    match = re.search(pattern, error_line)
-                    if match:
-                        fixed_line = re.sub(pattern, replacement, error_line, count=1)
-                        
-                        # Build context
-                        start = max(0, error.line - 3)
-                        end = min(len(lines), error.line + 2)
+                    # Build context
+                    original_section = content[section_start:section_stop]
+                    fixed_section = content[section_start:line_start] + fixed_line + content[line_stop:section_stop]
                         
-                        original_section = '\n'.join(lines[start:end])
-                        fixed_lines = lines.copy()
-                        fixed_lines[error.line - 1] = fixed_line
-                        fixed_section = '\n'.join(fixed_lines[start:end])
-                        
-                        return Fix(
-                            id=f"fix_{int(time.time()*1000)}",
-                            error_id=error.id,
-                            file_path=error.file_path or '',
-                            original=original_section,
-                            fixed=fixed_section,
-                            explanation=template['description'],
-                            confidence=template['confidence'],
-                            pattern_used=''
-                        )
+                    return Fix(
+                        id=self._next_fix_id(),
+                        error_id=error.id,
+                        file_path=error.file_path or '',
+                        original=original_section,
+                        fixed=fixed_section,
+                        explanation=template['description'],
+                        confidence=template['confidence'],
+                        pattern_used=''
+                    )
             
             # Fallback: try global pattern match
-            match = re.search(pattern, content)
+            match = pattern.search(content)
             if match:
                 start_pos = max(0, match.start() - 100)
                 end_pos = min(len(content), match.end() + 100)
                 
                 original_section = content[start_pos:end_pos]
-                fixed_section = re.sub(pattern, replacement, original_section, count=1)
+                fixed_section = pattern.sub(replacement, original_section, count=1)
                 
                 if original_section != fixed_section:
                     return Fix(
-                        id=f"fix_{int(time.time()*1000)}",
+                        id=self._next_fix_id(),
                         error_id=error.id,
                         file_path=error.file_path or '',
                         original=original_section,
@@ -555,6 +944,33 @@ class PatternEngine:
         """Calculate string similarity"""
         return difflib.SequenceMatcher(None, s1.lower(), s2.lower()).ratio()
     
+    def _learned_messages_lower(self) -> List[str]:
+        """Lowercased error messages of learned_fixes, extended as fixes are learned"""
+        if len(self._learned_lower) > len(self.learned_fixes):
+            self._learned_lower = []
+        for learned in self.learned_fixes[len(self._learned_lower):]:
+            self._learned_lower.append(learned.get('error_message', '').lower())
+        return self._learned_lower
+    
+    def _is_similar_lower(self, a: str, b: str, threshold: float) -> bool:
+        """Same as _similarity(a, b) > threshold for already-lowercased strings,
+        rejecting on difflib's cheap upper bounds first"""
+        total = len(a) + len(b)
+        if not total:
+            return 1.0 > threshold
+        
+        # ratio() is 2 * matches / total and can never match more than the shorter string
+        if 2.0 * min(len(a), len(b)) / total <= threshold:
+            return False
+        
+        # difflib's matching blocks form a common subsequence, so RapidFuzz's
+        # 2 * LCS / total ratio bounds ratio() from above (small slack for rounding)
+        if RAPIDFUZZ_AVAILABLE and rapidfuzz_fuzz.ratio(a, b) + 1e-6 <= threshold * 100:
+            return False
+        
+        matcher = difflib.SequenceMatcher(None, a, b)
+        return matcher.quick_ratio() > threshold and matcher.ratio() > threshold
+    
     def learn_fix(self, fix: Fix, success: bool):
         """Learn from fix outcome - SELF-LEARNING"""
         if success and fix.confidence > 0.5:
@@ -568,14 +984,10 @@ class PatternEngine:
                 'verified': True
             }
             self.learned_fixes.append(learned)
+            self._learned_version += 1
             
             try:
-                if AgentConfig.FIX_HISTORY_FILE.exists():
-                    history = json.loads(AgentConfig.FIX_HISTORY_FILE.read_text())
-                else:
-                    history = []
-                history.append(asdict(fix))
-                AgentConfig.FIX_HISTORY_FILE.write_text(json.dumps(history[-500:], indent=2))
+                self._append_fix_history(fix.to_dict())
             except:
                 pass
 
@@ -583,44 +995,114 @@ class PatternEngine:
 # CODE ANALYZER - STATIC ANALYSIS
 # ============================================================================
 
+@contextmanager
+def _source_bytes(file_path: Path) -> Iterator[Union[bytes, mmap.mmap]]:
+    """File contents as bytes, mmapped read-only when the file is large"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < AgentConfig.MMAP_MIN_BYTES:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _is_plain_ascii(data: Union[bytes, mmap.mmap]) -> bool:
+    """True when decoding would not change the bytes: ASCII only and no \\r newlines"""
+    if data.find(b'\r') != -1:
+        return False
+    if isinstance(data, bytes):
+        return data.isascii()
+    return all(data[i:i + 65536].isascii() for i in range(0, len(data), 65536))
+
+
+def _decode_source(data: Union[bytes, mmap.mmap], errors: str = 'ignore') -> str:
+    """Same text as read_text(encoding='utf-8', errors=errors) gives for these bytes"""
+    content = str(data, 'utf-8', errors)
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
 class CodeAnalyzer:
     """Static code analysis without external APIs"""
     
+    # One pass over the whole file. Every rule starts with a literal and consumes
+    # only that literal, so overlapping hits (e.g. `var x==1`) are all found;
+    # the surrounding checks never cross a newline.
+    JS_SCANNER = re.compile(
+        r'(?P<console>console\.log)'
+        r'|(?P<var>var(?<=\bvar)(?=[^\S\n]+\w))'
+        r'|(?P<eqeq>==(?<=[^=!\n]==)(?=[^=\n]))'
+        r'|(?P<localhost>http://localhost:(?=\d))'
+    )
+    # Same rules for raw ASCII bytes (see _is_plain_ascii); the whitespace class spells out what
+    # str-mode \s matches in ASCII (bytes-mode \s omits \x1c-\x1f)
+    JS_SCANNER_BYTES = re.compile(
+        rb'(?P<console>console\.log)'
+        rb'|(?P<var>var(?<=\bvar)(?=[\t\x0b\x0c\x1c-\x1f ]+\w))'
+        rb'|(?P<eqeq>==(?<=[^=!\n]==)(?=[^=\n]))'
+        rb'|(?P<localhost>http://localhost:(?=\d))'
+    )
+    JS_RULES = {
+        'console': ('quality', 'console.log found', 'low'),
+        'var': ('style', 'Use let/const instead of var', 'low'),
+        'eqeq': ('quality', 'Use === instead of ==', 'medium'),
+        'localhost': ('config', 'Hardcoded localhost URL', 'high'),
+    }
+    JS_RULE_ORDER = {name: i for i, name in enumerate(JS_RULES)}
+    
+    IMG_TAG = re.compile(r'<img[^>]*>')
+    IMG_TAG_BYTES = re.compile(rb'<img[^>]*>')
+    
     def analyze_javascript(self, file_path: Path) -> List[Dict]:
         """Analyze JavaScript file for common issues"""
         issues = []
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            lines = content.split('\n')
+            check_console = 'debug' not in str(file_path).lower()
+            with _source_bytes(file_path) as data:
+                if _is_plain_ascii(data):
+                    hits = self._scan_javascript(data, self.JS_SCANNER_BYTES, check_console)
+                else:
+                    hits = self._scan_javascript(_decode_source(data), self.JS_SCANNER, check_console)
             
-            for i, line in enumerate(lines, 1):
-                # Check for console.log in production
-                if 'console.log' in line and 'debug' not in str(file_path).lower():
-                    issues.append({'type': 'quality', 'message': 'console.log found', 'line': i, 'severity': 'low'})
-                
-                # Check for var (should use let/const)
-                if re.search(r'\bvar\s+\w+', line):
-                    issues.append({'type': 'style', 'message': 'Use let/const instead of var', 'line': i, 'severity': 'low'})
-                
-                # Check for == instead of ===
-                if re.search(r'[^=!]==[^=]', line) and '===' not in line:
-                    issues.append({'type': 'quality', 'message': 'Use === instead of ==', 'line': i, 'severity': 'medium'})
-                
-                # Check for hardcoded URLs
-                if re.search(r'http://localhost:\d+', line):
-                    issues.append({'type': 'config', 'message': 'Hardcoded localhost URL', 'line': i, 'severity': 'high'})
+            for line, _, rule in sorted(hits):
+                issue_type, message, severity = self.JS_RULES[rule]
+                issues.append({'type': issue_type, 'message': message, 'line': line, 'severity': severity})
         
         except Exception as e:
             issues.append({'type': 'error', 'message': f'Analysis failed: {e}', 'severity': 'high'})
         
         return issues
     
+    def _scan_javascript(self, content: Union[str, bytes, mmap.mmap], scanner: re.Pattern, check_console: bool) -> Set[Tuple[int, int, str]]:
+        """(line, rule order, rule) hits, at most one per rule per line; content is str or mapped bytes"""
+        newline, strict_eq = ('\n', '===') if isinstance(content, str) else (b'\n', b'===')
+        starts = _line_starts(content, len(content) + 1, newline)
+        hits = set()
+        for match in scanner.finditer(content):
+            rule = match.lastgroup
+            if rule == 'console' and not check_console:
+                continue
+            line = bisect.bisect_right(starts, match.start())
+            if rule == 'eqeq':
+                end = starts[line] - 1 if line < len(starts) else len(content)
+                if content.find(strict_eq, starts[line - 1], end) != -1:
+                    continue
+            hits.add((line, self.JS_RULE_ORDER[rule], rule))
+        return hits
+    
     def analyze_json(self, file_path: Path) -> List[Dict]:
         """Analyze JSON file"""
         issues = []
+        data = file_path.read_bytes()
+        if ORJSON_AVAILABLE:
+            try:
+                orjson.loads(data)
+                return issues
+            except orjson.JSONDecodeError:
+                pass  # re-parse below for the stdlib error message and line
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
-            json.loads(content)
+            json.loads(_decode_source(data))
         except json.JSONDecodeError as e:
             issues.append({'type': 'syntax', 'message': f'Invalid JSON: {e.msg}', 'line': e.lineno, 'severity': 'critical'})
         return issues
@@ -629,35 +1111,243 @@ class CodeAnalyzer:
         """Analyze HTML file"""
         issues = []
         try:
-            content = file_path.read_text(encoding='utf-8', errors='ignore')
+            with _source_bytes(file_path) as data:
+                if _is_plain_ascii(data):
+                    missing_alt, has_viewport = self._scan_html(data, self.IMG_TAG_BYTES, b'alt=', b'<meta name="viewport"')
+                else:
+                    missing_alt, has_viewport = self._scan_html(_decode_source(data), self.IMG_TAG, 'alt=', '<meta name="viewport"')
             
             # Check for missing alt attributes
-            for match in re.finditer(r'<img[^>]*>', content):
-                if 'alt=' not in match.group():
-                    issues.append({'type': 'accessibility', 'message': 'Image missing alt attribute', 'severity': 'medium'})
+            for _ in range(missing_alt):
+                issues.append({'type': 'accessibility', 'message': 'Image missing alt attribute', 'severity': 'medium'})
             
             # Check for missing viewport
-            if '<meta name="viewport"' not in content:
+            if not has_viewport:
                 issues.append({'type': 'mobile', 'message': 'Missing viewport meta tag', 'severity': 'medium'})
         
         except Exception as e:
             issues.append({'type': 'error', 'message': f'Analysis failed: {e}', 'severity': 'high'})
         
         return issues
+    
+    @staticmethod
+    def _scan_html(content: Union[str, bytes, mmap.mmap], img_tag: re.Pattern, alt: Union[str, bytes], viewport: Union[str, bytes]) -> Tuple[int, bool]:
+        """(images missing alt, has viewport meta)"""
+        missing_alt = sum(1 for match in img_tag.finditer(content) if match.group().find(alt) == -1)
+        return missing_alt, content.find(viewport) != -1
 
 # ============================================================================
 # MAIN AGENT
 # ============================================================================
 
+def _glob_part_regex(part: str) -> str:
+    """fnmatch regex for one path component, its wildcards kept inside the component;
+    components are joined with NUL, which no path component can contain"""
+    out = []
+    i, n = 0, len(part)
+    while i < n:
+        c = part[i]
+        i += 1
+        if c == '*':
+            if not out or out[-1] != '[^\0]*':
+                out.append('[^\0]*')
+        elif c == '?':
+            out.append('[^\0]')
+        elif c == '[':
+            # Bracket scan as in fnmatch.translate; an unclosed '[' is a literal
+            j = i
+            if j < n and part[j] == '!':
+                j += 1
+            if j < n and part[j] == ']':
+                j += 1
+            while j < n and part[j] != ']':
+                j += 1
+            if j >= n:
+                out.append('\\[')
+            else:
+                out.append('(?!\0)' + fnmatch.translate(part[i - 1:j + 1])[4:-3])
+                i = j + 1
+        else:
+            out.append(re.escape(c))
+    return ''.join(out)
+
+
+def _compile_path_patterns(patterns: List[str]) -> re.Pattern:
+    """One regex answering any(path.match(p) for p in patterns) when searched in
+    '\0'.join(path.parts): relative patterns match the trailing components, absolute
+    ones the whole path (Path.match semantics, where '**' is just '*')"""
+    alternatives = []
+    for pattern in patterns:
+        parts = PurePosixPath(pattern).parts
+        if not parts:
+            continue
+        if parts[0].startswith('/'):
+            regexes = [re.escape(parts[0])] + [_glob_part_regex(part) for part in parts[1:]]
+            alternatives.append('\\A' + '\0'.join(regexes) + '\\Z')
+        else:
+            alternatives.append('(?:\\A|\0)(?!\\Z)' + '\0'.join(map(_glob_part_regex, parts)) + '\\Z')
+    return re.compile('|'.join(alternatives) or '(?!)')
+
+
+def _iter_suffix(root: Path, suffix: str, recursive: bool = False) -> Iterator[Path]:
+    """Entries under root named *suffix, in the order root.glob('*suffix') or
+    root.glob('**/*suffix') yields them, listing each directory only once"""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+    
+    subdirs = []
+    for entry in entries:
+        if entry.name.endswith(suffix):
+            yield root / entry.name
+        if recursive:
+            try:
+                if entry.is_dir() and not entry.is_symlink():
+                    subdirs.append(entry.name)
+            except OSError:
+                pass
+    
+    for name in subdirs:
+        yield from _iter_suffix(root / name, suffix, recursive=True)
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Make dst a hard link to src (no data copied), or a copy where linking fails"""
+    try:
+        os.link(os.path.realpath(src), dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+
+def _replace_file(path: Path, data: Union[str, bytes]):
+    """write_text(data, encoding='utf-8') or write_bytes(data) into a new inode renamed over
+    path (through any symlink), keeping its mode; hard links to the old inode keep the old content"""
+    target = Path(os.path.realpath(path))
+    tmp = target.with_name(target.name + '.tmp')
+    try:
+        if isinstance(data, str):
+            tmp.write_text(data, encoding='utf-8')
+        else:
+            tmp.write_bytes(data)
+        shutil.copymode(target, tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def _tree_index(root: Path) -> Set[str]:
+    """'/'-joined paths, relative to root, of every file and directory under it
+    (symlinks followed for existence, but not descended into, like _iter_suffix)"""
+    index = set()
+    pending = ['']
+    while pending:
+        rel = pending.pop()
+        try:
+            with os.scandir(root / rel) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        
+        for entry in entries:
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                if entry.is_dir():
+                    index.add(path)
+                    if not entry.is_symlink():
+                        pending.append(path)
+                elif entry.is_file():
+                    index.add(path)
+            except OSError:
+                pass
+    
+    return index
+
+
 class BlackonnAgent:
     """Self-contained autonomous AI agent - NO API NEEDED"""
     
+    # Scanner patterns, compiled once instead of per file / per error
+    NODE_ERROR_LINE = re.compile(r':(\d+)')
+    SCRIPT_SRC = re.compile(r'src=["\']([^"\']+\.js)["\']')
+    SCRIPT_SRC_BYTES = re.compile(rb'src=["\']([^"\']+\.js)["\']')
+    URL_ORIGIN = re.compile(r'^https?://[^/]+')
+    # any(path.match(p) for p in IGNORE_PATTERNS) as one search (see _compile_path_patterns)
+    IGNORE_RE = _compile_path_patterns(AgentConfig.IGNORE_PATTERNS)
+    
+    # Databases rebuild() creates or repairs, with their default content serialized once
+    DB_DEFAULTS = {
+        "users.json": [],
+        "products.json": [],
+        "orders.json": [],
+        "carts.json": {},
+        "sessions.json": {},
+        "slides.json": [],
+        "wishlists.json": {},
+        "contacts.json": [],
+        "adminSettings.json": {"siteName": "BLACKONN", "maintenance": False}
+    }
+    DB_DEFAULT_BYTES = {filename: _dumpb_indent(default) for filename, default in DB_DEFAULTS.items()}
+    
+    # Long-lived node process that compiles each path it reads on stdin (one JSON
+    # string per line) the way `node --check` does for CommonJS files, answering
+    # 1 (compiles) or 0 (failed, or an ES module scope it does not handle)
+    NODE_SYNTAX_DRIVER = r"""
+const fs = require('fs'), path = require('path'), vm = require('vm');
+const params = ['exports', 'require', 'module', '__filename', '__dirname'];
+const moduleScope = new Map();
+function isModuleScope(dir) {
+  if (moduleScope.has(dir)) return moduleScope.get(dir);
+  let result = false;
+  const pkg = path.join(dir, 'package.json');
+  if (fs.existsSync(pkg)) {
+    try { result = JSON.parse(fs.readFileSync(pkg, 'utf8').replace(/^\uFEFF/, '')).type === 'module'; } catch (e) { result = true; }
+  } else if (path.dirname(dir) !== dir) {
+    result = isModuleScope(path.dirname(dir));
+  }
+  moduleScope.set(dir, result);
+  return result;
+}
+require('readline').createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line) { moduleScope.clear(); return; }  // new batch: package.json files may have changed
+  let ok = false;
+  try {
+    const file = path.resolve(JSON.parse(line));
+    if (file.endsWith('.js') && !isModuleScope(path.dirname(file))) {
+      let source = fs.readFileSync(file, 'utf8');
+      if (source.charCodeAt(0) === 0xFEFF) source = source.slice(1);
+      vm.compileFunction(source, params, { filename: file });
+      ok = true;
+    }
+  } catch (e) {}
+  process.stdout.write(ok ? '1\n' : '0\n');
+});
+"""
+    
     def __init__(self):
         self.pattern_engine = PatternEngine()
         self.code_analyzer = CodeAnalyzer()
         self.memory = self._load_memory()
+        self._seen_deque = deque(dict.fromkeys(self.memory.get('seen_errors', [])), maxlen=AgentConfig.SEEN_ERRORS_LIMIT)
+        self._seen_set = set(self._seen_deque)
+        self._memory_dirty = False
+        self._memory_saved_at = 0.0
         self.actions: List[Action] = []
         self.running = False
+        self._id_cache: Dict[str, str] = {}
+        self._last_read: Optional[Tuple[str, int, int, bytes]] = None
+        # ((mtime_ns, size), last CLIENT_LOG_TAIL entries) of the client error log
+        self._client_log_tail: Optional[Tuple[Tuple[int, int], List]] = None
+        self._syntax_worker: Optional[subprocess.Popen] = None
+        self._syntax_worker_lock = threading.Lock()
+        self._analysis_pool: Optional[ProcessPoolExecutor] = None
+        # Held by API requests that scan, fix or rebuild: they change memory and source files
+        self._api_lock = threading.Lock()
         
         print(f"--- BLACKONN AI AGENT v2.0 (SELF-CONTAINED) ---")
         print(f"Intelligence: Pattern Engine + Code Analyzer")
@@ -670,18 +1360,48 @@ class BlackonnAgent:
         """Load agent memory"""
         try:
             if AgentConfig.MEMORY_FILE.exists():
-                return json.loads(AgentConfig.MEMORY_FILE.read_text())
+                return _loads(AgentConfig.MEMORY_FILE.read_bytes())
         except:
             pass
         return {'seen_errors': [], 'stats': {'fixes': 0, 'scans': 0}}
     
+    def _mark_seen(self, error_id: str):
+        """Remember an error id, forgetting the oldest beyond SEEN_ERRORS_LIMIT"""
+        if error_id in self._seen_set:
+            return
+        if len(self._seen_deque) == self._seen_deque.maxlen:
+            self._seen_set.discard(self._seen_deque[0])
+        self._seen_deque.append(error_id)
+        self._seen_set.add(error_id)
+    
+    def _short_id(self, key: str) -> str:
+        """8-hex error id for a path or URL, memoized across scans"""
+        short = self._id_cache.get(key)
+        if short is None:
+            short = self._id_cache[key] = hashlib.md5(key.encode()).hexdigest()[:8]
+        return short
+    
     def _save_memory(self):
         """Save agent memory"""
         try:
-            AgentConfig.MEMORY_FILE.write_text(json.dumps(self.memory, indent=2))
+            AgentConfig.MEMORY_FILE.write_bytes(_dumpb_indent(self.memory))
         except:
             pass
     
+    def _mark_dirty(self):
+        """Note that memory changed; _maybe_flush decides when to write it"""
+        self._memory_dirty = True
+    
+    def _maybe_flush(self, force: bool = False):
+        """Save memory if dirty and MEMORY_FLUSH_INTERVAL has passed (or force)"""
+        if not self._memory_dirty:
+            return
+        now = time.monotonic()
+        if force or now - self._memory_saved_at >= AgentConfig.MEMORY_FLUSH_INTERVAL:
+            self._save_memory()
+            self._memory_dirty = False
+            self._memory_saved_at = now
+    
     def _log_action(self, action: Action):
         """Log action"""
         self.actions.append(action)
@@ -699,22 +1419,31 @@ class BlackonnAgent:
         
         print("\n[AGENT] Scanning for errors...")
         
-        # 1. Client error logs
-        errors.extend(self._scan_client_errors())
-        
-        # 2. Syntax check JS files
-        errors.extend(self._syntax_check_js())
-        
-        # 3. Validate JSON files
-        errors.extend(self._validate_json_files())
-        
-        # 4. Check missing resources
-        errors.extend(self._check_resources())
-        
-        # 5. Static code analysis
-        errors.extend(self._static_analysis())
+        # The stages run side by side (overlapping file I/O and node waits) and their
+        # results are merged in this order. They must not write agent memory from their
+        # threads: the syntax stage only reads js_check_cache, and its outcomes are
+        # recorded here on the calling thread. The rest they share is thread-safe: the
+        # node worker sits behind its lock, _short_id's dict only gains the same
+        # deterministic values, and the analysis pool never forks (see _analyze_many)
+        stages = (
+            self._scan_client_errors,   # 1. Client error logs
+            self._syntax_check_js,      # 2. Syntax check JS files
+            self._validate_json_files,  # 3. Validate JSON files
+            self._check_resources,      # 4. Check missing resources
+            self._static_analysis,      # 5. Static code analysis
+        )
+        with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+            futures = [pool.submit(stage) for stage in stages]
+        results = [future.result() for future in futures]
+        
+        js_errors, js_hits, js_checked = results[1]
+        self._record_js_checks(js_hits, js_checked)
+        results[1] = js_errors
+        for result in results:
+            errors.extend(result)
         
         print(f"[AGENT] Found {len(errors)} issue(s)")
+        self._maybe_flush()
         return errors
     
     def _scan_client_errors(self) -> List[Error]:
@@ -722,8 +1451,16 @@ class BlackonnAgent:
         errors = []
         try:
             if AgentConfig.ERROR_LOG_PATH.exists():
-                data = json.loads(AgentConfig.ERROR_LOG_PATH.read_text())
-                for item in data[-50:]:
+                # The Node backend rewrites the whole array on each report; while it is
+                # unchanged, reuse the tail parsed last scan instead of re-reading it
+                st = AgentConfig.ERROR_LOG_PATH.stat()
+                signature = (st.st_mtime_ns, st.st_size)
+                if self._client_log_tail is not None and self._client_log_tail[0] == signature:
+                    tail = self._client_log_tail[1]
+                else:
+                    tail = _loads(AgentConfig.ERROR_LOG_PATH.read_bytes())[-AgentConfig.CLIENT_LOG_TAIL:]
+                    self._client_log_tail = (signature, tail)
+                for item in tail:
                     err = Error(
                         id=item.get('id', f"client_{int(time.time()*1000)}"),
                         timestamp=item.get('timestamp', datetime.now().isoformat()),
@@ -739,45 +1476,153 @@ class BlackonnAgent:
             print(f"[AGENT] Error reading client logs: {e}")
         return errors
     
-    def _syntax_check_js(self) -> List[Error]:
-        """Syntax check JavaScript files"""
-        errors = []
+    def _syntax_check_js(self) -> Tuple[List[Error], List[str], List[Tuple[str, Optional[List[int]], bool]]]:
+        """Syntax check JavaScript files: the errors, paths skipped as unchanged, and
+        (path, signature, passed) per file checked. js_check_cache is only read here, so
+        this can run on a scan thread; _record_js_checks applies the results"""
+        js_files = [
+            js_file for js_file in _iter_suffix(AgentConfig.FRONTEND_DIR, ".js", recursive=True)
+            if not self.IGNORE_RE.search('\0'.join(js_file.parts))
+        ]
         
-        for js_file in AgentConfig.FRONTEND_DIR.glob("**/*.js"):
-            if any(js_file.match(p) for p in AgentConfig.IGNORE_PATTERNS):
+        # Files that passed `node --check` unchanged since the last scan are skipped:
+        # {path: [mtime_ns, size]}, oldest first, kept in agent memory
+        cache = self.memory.get('js_check_cache', {})
+        hits = []
+        to_check = []
+        for js_file in js_files:
+            key = str(js_file)
+            try:
+                st = js_file.stat()
+                signature = [st.st_mtime_ns, st.st_size]
+            except OSError:
+                signature = None
+            if signature is not None and cache.get(key) == signature:
+                hits.append(key)
                 continue
+            to_check.append((js_file, signature))
+        
+        # One node process compiles everything first; only files it cannot pass get a
+        # separate `node --check` (for its exact message), several at once, in file order
+        compiled = self._node_compile_many([js_file for js_file, _ in to_check])
+        pending = [js_file for (js_file, _), ok in zip(to_check, compiled) if not ok]
+        with ThreadPoolExecutor(max_workers=AgentConfig.SYNTAX_CHECK_WORKERS) as pool:
+            checked = dict(zip(pending, pool.map(self._node_check, pending)))
+        
+        errors = []
+        outcomes = []
+        for (js_file, signature), ok in zip(to_check, compiled):
+            passed, error = (True, None) if ok else checked[js_file]
+            if error:
+                errors.append(error)
+            outcomes.append((str(js_file), signature, passed))
+        
+        return errors, hits, outcomes
+    
+    def _record_js_checks(self, hits: List[str], checked: List[Tuple[str, Optional[List[int]], bool]]):
+        """Apply _syntax_check_js results to js_check_cache, on the thread that owns agent memory"""
+        cache = self.memory.setdefault('js_check_cache', {})
+        for key in hits:
+            signature = cache.pop(key, None)
+            if signature is not None:
+                cache[key] = signature  # most recently seen last
+        
+        changed = False
+        for key, signature, passed in checked:
+            if passed and signature is not None:
+                cache[key] = signature
+                changed = True
+            elif cache.pop(key, None) is not None:
+                changed = True
+        
+        if changed:
+            while len(cache) > AgentConfig.SYNTAX_CACHE_LIMIT:
+                del cache[next(iter(cache))]
+            self._mark_dirty()
+    
+    def _node_compile_many(self, js_files: List[Path]) -> List[bool]:
+        """Compile files in the persistent node process; False where it failed or could not tell"""
+        compiled = [False] * len(js_files)
+        if not js_files:
+            return compiled
+        
+        with self._syntax_worker_lock:
+            worker = self._syntax_worker
+            if worker is None or worker.poll() is not None:
+                try:
+                    worker = self._syntax_worker = subprocess.Popen(
+                        ["node", "-e", self.NODE_SYNTAX_DRIVER],
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                        text=True, encoding='utf-8'
+                    )
+                except OSError:
+                    self._syntax_worker = None
+                    return compiled
             
             try:
-                result = subprocess.run(
-                    ["node", "--check", str(js_file)],
-                    capture_output=True, text=True, timeout=10
-                )
-                if result.returncode != 0:
-                    match = re.search(r':(\d+)', result.stderr)
-                    line_num = int(match.group(1)) if match else None
-                    
-                    errors.append(Error(
-                        id=f"syntax_{hashlib.md5(str(js_file).encode()).hexdigest()[:8]}",
-                        timestamp=datetime.now().isoformat(),
-                        type='syntax',
-                        message=result.stderr[:300],
-                        file_path=str(js_file),
-                        line=line_num,
-                        severity=Severity.HIGH
-                    ))
-            except:
+                worker.stdin.write('\n')
+                for i, js_file in enumerate(js_files):
+                    worker.stdin.write(json.dumps(str(js_file)) + '\n')
+                    worker.stdin.flush()
+                    answer = worker.stdout.readline()
+                    if not answer:
+                        break  # worker died; the rest go through node --check
+                    compiled[i] = answer == '1\n'
+                else:
+                    return compiled
+            except OSError:
                 pass
         
-        return errors
+        self._close_node_worker()
+        return compiled
+    
+    def _close_node_worker(self):
+        """Stop the persistent node syntax worker, if one is running"""
+        with self._syntax_worker_lock:
+            worker, self._syntax_worker = self._syntax_worker, None
+        if worker is None:
+            return
+        try:
+            worker.stdin.close()
+        except OSError:
+            pass
+        try:
+            worker.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+            worker.wait()
+    
+    def _node_check(self, js_file: Path) -> Tuple[bool, Optional[Error]]:
+        """Run `node --check` on one file: (passed, syntax error if it failed)"""
+        try:
+            result = subprocess.run(
+                ["node", "--check", str(js_file)],
+                capture_output=True, text=True, timeout=10
+            )
+            if result.returncode != 0:
+                match = self.NODE_ERROR_LINE.search(result.stderr)
+                line_num = int(match.group(1)) if match else None
+                
+                return False, Error(
+                    id=f"syntax_{self._short_id(str(js_file))}",
+                    timestamp=datetime.now().isoformat(),
+                    type='syntax',
+                    message=result.stderr[:300],
+                    file_path=str(js_file),
+                    line=line_num,
+                    severity=Severity.HIGH
+                )
+            return True, None
+        except:
+            return False, None
     
     def _validate_json_files(self) -> List[Error]:
         """Validate JSON files"""
         errors = []
         
-        for json_file in AgentConfig.DATA_DIR.glob("*.json"):
+        for json_file in _iter_suffix(AgentConfig.DATA_DIR, ".json"):
             try:
-                content = json_file.read_text()
-                json.loads(content)
+                _check_json_file(json_file)
             except json.JSONDecodeError as e:
                 errors.append(Error(
                     id=f"json_{json_file.stem}",
@@ -794,20 +1639,28 @@ class BlackonnAgent:
     def _check_resources(self) -> List[Error]:
         """Check for missing resources"""
         errors = []
+        # One walk per scan instead of a stat per <script src>; anything the index
+        # cannot vouch for (misses, '..', absolute paths) still gets a real stat
+        frontend_index = _tree_index(AgentConfig.FRONTEND_DIR)
         
-        for html_file in AgentConfig.FRONTEND_DIR.glob("*.html"):
+        for html_file in _iter_suffix(AgentConfig.FRONTEND_DIR, ".html"):
             try:
-                content = html_file.read_text(encoding='utf-8', errors='ignore')
+                with _source_bytes(html_file) as data:
+                    if _is_plain_ascii(data):
+                        srcs = [src.decode('ascii') for src in self.SCRIPT_SRC_BYTES.findall(data)]
+                    else:
+                        srcs = self.SCRIPT_SRC.findall(_decode_source(data))
                 
-                for match in re.finditer(r'src=["\']([^"\']+\.js)["\']', content):
-                    src = match.group(1)
+                for src in srcs:
                     if src.startswith('http') or src.startswith('//'):
                         continue
                     
+                    if posixpath.normpath(src) in frontend_index and '..' not in src.split('/'):
+                        continue
                     resource = AgentConfig.FRONTEND_DIR / src
                     if not resource.exists():
                         errors.append(Error(
-                            id=f"missing_{hashlib.md5(src.encode()).hexdigest()[:8]}",
+                            id=f"missing_{self._short_id(src)}",
                             timestamp=datetime.now().isoformat(),
                             type='resource',
                             message=f"Missing script: {src}",
@@ -828,29 +1681,62 @@ class BlackonnAgent:
             AgentConfig.FRONTEND_DIR / "assets" / "js" / "api.js",
         ]
         
-        for js_file in critical_files:
-            if js_file.exists():
-                issues = self.code_analyzer.analyze_javascript(js_file)
-                for issue in issues:
-                    if issue['severity'] in ['high', 'critical']:
-                        errors.append(Error(
-                            id=f"analysis_{js_file.stem}_{issue.get('line', 0)}",
-                            timestamp=datetime.now().isoformat(),
-                            type=issue['type'],
-                            message=issue['message'],
-                            file_path=str(js_file),
-                            line=issue.get('line'),
-                            severity=Severity.MEDIUM
-                        ))
+        js_files = [js_file for js_file in critical_files if js_file.exists()]
+        for js_file, issues in zip(js_files, self._analyze_many(js_files)):
+            for issue in issues:
+                if issue['severity'] in ['high', 'critical']:
+                    errors.append(Error(
+                        id=f"analysis_{js_file.stem}_{issue.get('line', 0)}",
+                        timestamp=datetime.now().isoformat(),
+                        type=issue['type'],
+                        message=issue['message'],
+                        file_path=str(js_file),
+                        line=issue.get('line'),
+                        severity=Severity.MEDIUM
+                    ))
         
         return errors
     
+    def _analyze_many(self, js_files: List[Path]) -> List[List[Dict]]:
+        """analyze_javascript for each file, in order; spread over processes when there
+        are several cores and enough source to be worth it"""
+        analyze = self.code_analyzer.analyze_javascript
+        if min(len(js_files), os.cpu_count() or 1) < 2:
+            return [analyze(js_file) for js_file in js_files]
+        try:
+            total = sum(js_file.stat().st_size for js_file in js_files)
+        except OSError:
+            total = 0
+        if total < AgentConfig.ANALYSIS_POOL_MIN_BYTES:
+            return [analyze(js_file) for js_file in js_files]
+        
+        try:
+            if self._analysis_pool is None:
+                # Never fork: scan() gets here on a stage thread while the other stages hold
+                # locks and node pipes, which a forked child would inherit mid-use
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._analysis_pool = ProcessPoolExecutor(
+                    max_workers=min(len(js_files), os.cpu_count()), mp_context=context
+                )
+            return list(self._analysis_pool.map(analyze, js_files))
+        except Exception:
+            # Broken or unavailable pool: drop it and analyze inline
+            self._close_analysis_pool()
+            return [analyze(js_file) for js_file in js_files]
+    
+    def _close_analysis_pool(self):
+        """Shut down the static-analysis process pool, if one was started"""
+        pool, self._analysis_pool = self._analysis_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
     def _resolve_path(self, source: str) -> Optional[str]:
         """Resolve source URL to file path"""
         if not source:
             return None
         
-        source = re.sub(r'^https?://[^/]+', '', source).lstrip('/')
+        source = self.URL_ORIGIN.sub('', source).lstrip('/')
         
         frontend = AgentConfig.FRONTEND_DIR / source
         if frontend.exists():
@@ -871,9 +1757,14 @@ class BlackonnAgent:
         print(f"\n[AGENT] 🔧 Analyzing: {error.message[:80]}...")
         
         file_content = None
-        if error.file_path and Path(error.file_path).exists():
+        if error.file_path:
             try:
-                file_content = Path(error.file_path).read_text(encoding='utf-8', errors='ignore')
+                with open(error.file_path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    data = f.read()
+                file_content = _decode_source(data)
+                # _apply_fix reuses these bytes if the file is unchanged
+                self._last_read = (error.file_path, st.st_mtime_ns, st.st_size, data)
             except:
                 pass
         
@@ -905,7 +1796,8 @@ class BlackonnAgent:
                 error.status = FixStatus.SUCCESS
                 self.pattern_engine.learn_fix(fix, True)
                 self.memory['stats']['fixes'] = self.memory['stats'].get('fixes', 0) + 1
-                self._save_memory()
+                self._mark_dirty()
+                self._maybe_flush()
                 return fix
         else:
             print(f"[AGENT] ⚠ Confidence too low ({fix.confidence:.0%})")
@@ -916,10 +1808,17 @@ class BlackonnAgent:
         """Apply a fix"""
         try:
             file_path = Path(fix.file_path)
-            if not file_path.exists():
+            try:
+                st = file_path.stat()
+            except OSError:
                 return False
             
-            content = file_path.read_text(encoding='utf-8')
+            last_read, self._last_read = self._last_read, None
+            if last_read and last_read[:3] == (fix.file_path, st.st_mtime_ns, st.st_size):
+                data = last_read[3]
+            else:
+                data = file_path.read_bytes()
+            content = _decode_source(data, 'strict')
             
             if fix.original not in content:
                 print(f"[AGENT] ✗ Original code not found")
@@ -927,21 +1826,21 @@ class BlackonnAgent:
             
             # Create backup
             backup = file_path.with_suffix(f".bak.{int(time.time())}")
-            shutil.copy(file_path, backup)
+            _link_or_copy(file_path, backup)
             
-            # Apply fix
+            # Apply fix (into a new inode, so a linked backup keeps the old content)
             new_content = content.replace(fix.original, fix.fixed, 1)
-            file_path.write_text(new_content, encoding='utf-8')
+            _replace_file(file_path, new_content)
             
             fix.applied = True
             
             # Verify fix
             if fix.file_path.endswith('.js'):
-                result = subprocess.run(
+                ok = self._node_compile_many([file_path])[0] or subprocess.run(
                     ["node", "--check", str(file_path)],
                     capture_output=True, timeout=10
-                )
-                if result.returncode != 0:
+                ).returncode == 0
+                if not ok:
                     shutil.copy(backup, file_path)
                     print(f"[AGENT] ✗ Fix broke syntax, rolled back")
                     return False
@@ -992,31 +1891,20 @@ class BlackonnAgent:
                 print(f"[AGENT] 📁 Created: {d}")
         
         # 2. Repair JSON databases
-        db_defaults = {
-            "users.json": [],
-            "products.json": [],
-            "orders.json": [],
-            "carts.json": {},
-            "sessions.json": {},
-            "slides.json": [],
-            "wishlists.json": {},
-            "contacts.json": [],
-            "adminSettings.json": {"siteName": "BLACKONN", "maintenance": False}
-        }
-        
-        for filename, default in db_defaults.items():
+        for filename, default in self.DB_DEFAULT_BYTES.items():
             file_path = AgentConfig.DATA_DIR / filename
             try:
                 if file_path.exists():
-                    json.loads(file_path.read_text())
+                    _check_json_file(file_path)
                 else:
-                    file_path.write_text(json.dumps(default, indent=2))
+                    file_path.write_bytes(default)
                     results['actions'].append(f"Created: {filename}")
                     print(f"[AGENT] 📄 Created: {filename}")
             except json.JSONDecodeError:
+                # Backup keeps the corrupt inode; the default is swapped in atomically
                 backup = file_path.with_suffix(f".corrupted.{int(time.time())}")
-                shutil.move(file_path, backup)
-                file_path.write_text(json.dumps(default, indent=2))
+                _link_or_copy(file_path, backup)
+                _replace_file(file_path, default)
                 results['actions'].append(f"Repaired: {filename}")
                 print(f"[AGENT] 🔧 Repaired: {filename}")
         
@@ -1048,7 +1936,7 @@ class BlackonnAgent:
             try:
                 errors = self.scan()
                 
-                seen = set(self.memory.get('seen_errors', []))
+                seen = self._seen_set
                 new_errors = [e for e in errors if e.id not in seen]
                 
                 if new_errors:
@@ -1056,16 +1944,18 @@ class BlackonnAgent:
                     
                     for error in new_errors[:5]:
                         self.fix(error)
-                        seen.add(error.id)
+                        self._mark_seen(error.id)
                     
-                    self.memory['seen_errors'] = list(seen)[-500:]
-                    self._save_memory()
+                    self.memory['seen_errors'] = list(self._seen_deque)
+                    self._mark_dirty()
                 
+                self._maybe_flush(force=True)
                 time.sleep(AgentConfig.MONITOR_INTERVAL)
                 
             except KeyboardInterrupt:
                 print("\n[AGENT] Stopping...")
                 self.running = False
+                self._maybe_flush(force=True)
             except Exception as e:
                 print(f"[AGENT] Error: {e}")
                 time.sleep(5)
@@ -1073,6 +1963,9 @@ class BlackonnAgent:
     def stop(self):
         """Stop monitoring"""
         self.running = False
+        self._maybe_flush(force=True)
+        self._close_node_worker()
+        self._close_analysis_pool()
 
     # ========================================================================
     # API SERVER (OPTIONAL)
@@ -1099,22 +1992,28 @@ class BlackonnAgent:
         
         @app.route('/agent/scan', methods=['POST'])
         def scan():
-            errors = agent.scan()
-            return jsonify({'count': len(errors), 'errors': [asdict(e) for e in errors[:20]]})
+            with agent._api_lock:
+                errors = agent.scan()
+                agent._maybe_flush(force=True)
+            return jsonify({'count': len(errors), 'errors': [e.to_dict() for e in errors[:20]]})
         
         @app.route('/agent/fix', methods=['POST'])
         def fix():
-            errors = agent.scan()
-            fixes = []
-            for error in errors[:5]:
-                applied_fix = agent.fix(error)
-                if applied_fix:
-                    fixes.append(asdict(applied_fix))
+            with agent._api_lock:
+                errors = agent.scan()
+                fixes = []
+                for error in errors[:5]:
+                    applied_fix = agent.fix(error)
+                    if applied_fix:
+                        fixes.append(applied_fix.to_dict())
+                agent._maybe_flush(force=True)
             return jsonify({'fixes_applied': len(fixes), 'fixes': fixes})
         
         @app.route('/agent/rebuild', methods=['POST'])
         def rebuild():
-            return jsonify(agent.rebuild())
+            with agent._api_lock:
+                results = agent.rebuild()
+            return jsonify(results)
         
         @app.route('/agent/analyze', methods=['POST'])
         def analyze():
@@ -1168,7 +2067,10 @@ def main():
         app = agent.create_api()
         if app:
             print(f"[AGENT] API server on port {args.port}")
-            app.run(host="0.0.0.0", port=args.port)
+            if WAITRESS_AVAILABLE:
+                serve(app, host="0.0.0.0", port=args.port, threads=AgentConfig.API_THREADS)
+            else:
+                app.run(host="0.0.0.0", port=args.port, threaded=True)
     
     elif args.mode == "analyze":
         if args.file:
@@ -1186,6 +2088,10 @@ def main():
                 print(f"\nAnalysis of {file_path.name}:")
                 for issue in issues:
                     print(f"  Line {issue.get('line', '?')}: [{issue['severity']}] {issue['message']}")
+    
+    agent._maybe_flush(force=True)
+    agent._close_node_worker()
+    agent._close_analysis_pool()
 
 if __name__ == "__main__":
     if len(sys.argv) == 1 or (len(sys.argv) > 1 and sys.argv[1] in ["health", "status"]):
@@ -9,23 +9,39 @@ import sys
 from datetime import datetime
 import html
 import re
+from functools import lru_cache
+
+from _jsonio import loads as _loads, dumpb as _dumpb, emit as _emit
+
+# html.escape stays the miss path: its C-level str.replace chain beat both
+# str.translate with a maketrans table and a single-pass re.sub on our short fields,
+# and it already hands back the same object when there is nothing to escape, so a
+# [&<>"'] pre-scan would only add a second pass
+_escape_cached = lru_cache(maxsize=4096)(html.escape)
+
+
+def _esc(value):
+    """html.escape, memoized for the short strings (names, sizes, cities) that recur across emails"""
+    if type(value) is str:
+        return _escape_cached(value)
+    return html.escape(value)  # same error as before for None and other non-strings
+
+# Today's date as the emails print it, reformatted only when the day changes
+_TODAY_CACHE = {'date': None, 'year': None, 'long': None}
+
+
+def _today():
+    """{'date', 'year' (footer), 'long' ('%B %d, %Y')} for the current day"""
+    today = datetime.now().date()
+    if today != _TODAY_CACHE['date']:
+        _TODAY_CACHE.update(date=today, year=str(today.year), long=today.strftime('%B %d, %Y'))
+    return _TODAY_CACHE
 
 # ==========================================
-# EMAIL TEMPLATES
+# BASE LAYOUT
 # ==========================================
 
-class EmailTemplates:
-    def __init__(self):
-        self.brand_colors = {
-            'primary': '#0b0b0b',
-            'secondary': '#333333',
-            'accent': '#ffffff',
-            'success': '#10b981',
-            'warning': '#f59e0b',
-            'error': '#ef4444'
-        }
-        
-        self.base_styles = """
+BASE_STYLES = """
             body { font-family: 'Segoe UI', Arial, sans-serif; margin: 0; padding: 0; background: #f5f5f5; }
             .container { max-width: 600px; margin: 0 auto; background: #ffffff; }
             .header { background: #0b0b0b; padding: 30px; text-align: center; }
@@ -44,35 +60,38 @@ class EmailTemplates:
             .social-links { margin-top: 20px; }
             .social-links a { margin: 0 10px; color: #666; text-decoration: none; }
         """
-    
-    def _base_template(self, content, preview_text=""):
-        """Base HTML email template"""
-        return f"""
+
+# The base document around each email's preview text, content and footer year,
+# with the stylesheet baked in once at import instead of on every render
+_BASE_HEAD = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>BLACKONN</title>
-    <style>{self.base_styles}</style>
+    <style>""" + BASE_STYLES + """</style>
     <!--[if mso]>
     <style type="text/css">
-        .btn {{ background: #0b0b0b !important; }}
+        .btn { background: #0b0b0b !important; }
     </style>
     <![endif]-->
 </head>
 <body>
-    <div style="display:none;max-height:0;overflow:hidden;">{html.escape(preview_text)}</div>
+    <div style="display:none;max-height:0;overflow:hidden;">"""
+_BASE_BODY = """</div>
     <div class="container">
         <div class="header">
             <div class="logo">BLACKONN</div>
             <div style="color: rgba(255,255,255,0.7); font-size: 12px; margin-top: 5px;">Premium Black Clothing</div>
         </div>
         <div class="content">
-            {content}
+            """
+_BASE_FOOTER = """
         </div>
         <div class="footer">
-            <p style="margin-bottom: 15px;">© {datetime.now().year} BLACKONN. All rights reserved.</p>
+            <p style="margin-bottom: 15px;">© """
+_BASE_TAIL = """ BLACKONN. All rights reserved.</p>
             <p>You're receiving this email because you're a valued BLACKONN customer.</p>
             <div class="social-links">
                 <a href="#">Instagram</a> | <a href="#">Facebook</a> | <a href="#">Twitter</a>
@@ -86,40 +105,85 @@ class EmailTemplates:
 </body>
 </html>
 """
+
+# Item rows, filled with str.format and joined (no per-item string concatenation)
+_ORDER_ITEM_ROW = """
+            <tr>
+                <td>
+                    <strong>{name}</strong><br>
+                    <span style="color: #666; font-size: 13px;">
+                        Size: {size} | 
+                        Qty: {quantity}
+                    </span>
+                </td>
+                <td style="text-align: right;">₹{price:,.2f}</td>
+            </tr>
+            """
+_CART_ITEM_ROW = """
+            <div style="display: flex; align-items: center; padding: 15px 0; border-bottom: 1px solid #eee;">
+                <div style="flex: 1;">
+                    <strong>{name}</strong><br>
+                    <span style="color: #666;">₹{price:,.2f}</span>
+                </div>
+            </div>
+            """
+
+# ==========================================
+# EMAIL TEMPLATES
+# ==========================================
+
+class EmailTemplates:
+    # Shared by every instance; nothing here varies per email
+    brand_colors = {
+        'primary': '#0b0b0b',
+        'secondary': '#333333',
+        'accent': '#ffffff',
+        'success': '#10b981',
+        'warning': '#f59e0b',
+        'error': '#ef4444'
+    }
+    
+    base_styles = BASE_STYLES
+    
+    def _base_template(self, content, preview_text=""):
+        """Base HTML email template"""
+        return "".join((
+            _BASE_HEAD, _esc(preview_text),
+            _BASE_BODY, content,
+            _BASE_FOOTER, _today()['year'],
+            _BASE_TAIL,
+        ))
     
     def order_confirmation(self, data):
         """Order confirmation email"""
         order = data.get('order', {})
         customer = data.get('customer', {})
         
-        order_id = order.get('id', order.get('orderId', 'N/A'))
+        # Only fall back to 'orderId' when 'id' is absent, instead of looking it up eagerly
+        order_id = order['id'] if 'id' in order else order.get('orderId', 'N/A')
         items = order.get('items', [])
         total = order.get('total', 0)
         shipping = order.get('shipping', {})
+        ship_name = shipping['name'] if 'name' in shipping else customer.get('name', '')
         
-        items_html = ""
-        for item in items:
-            items_html += f"""
-            <tr>
-                <td>
-                    <strong>{html.escape(str(item.get('name', 'Product')))}</strong><br>
-                    <span style="color: #666; font-size: 13px;">
-                        Size: {html.escape(str(item.get('size', 'N/A')))} | 
-                        Qty: {item.get('quantity', 1)}
-                    </span>
-                </td>
-                <td style="text-align: right;">₹{item.get('price', 0):,.2f}</td>
-            </tr>
-            """
+        items_html = "".join(
+            _ORDER_ITEM_ROW.format(
+                name=_esc(str(item.get('name', 'Product'))),
+                size=_esc(str(item.get('size', 'N/A'))),
+                quantity=item.get('quantity', 1),
+                price=item.get('price', 0),
+            )
+            for item in items
+        )
         
         content = f"""
             <h1>🎉 Order Confirmed!</h1>
-            <p>Hi {html.escape(customer.get('name', 'there'))},</p>
+            <p>Hi {_esc(customer.get('name', 'there'))},</p>
             <p>Thank you for your order! We're getting it ready to be shipped. We will notify you when it has been sent.</p>
             
             <div class="highlight">
-                <strong>Order Number:</strong> #{html.escape(str(order_id))}<br>
-                <strong>Order Date:</strong> {datetime.now().strftime('%B %d, %Y')}
+                <strong>Order Number:</strong> #{_esc(str(order_id))}<br>
+                <strong>Order Date:</strong> {_today()['long']}
             </div>
             
             <h2 style="font-size: 18px; margin-top: 30px;">Order Summary</h2>
@@ -141,10 +205,10 @@ class EmailTemplates:
             
             <h2 style="font-size: 18px; margin-top: 30px;">Shipping Address</h2>
             <p style="background: #f8f8f8; padding: 15px; border-radius: 4px;">
-                {html.escape(shipping.get('name', customer.get('name', '')))}<br>
-                {html.escape(shipping.get('address', ''))}<br>
-                {html.escape(shipping.get('city', ''))}, {html.escape(shipping.get('state', ''))}<br>
-                {html.escape(shipping.get('pincode', ''))}
+                {_esc(ship_name)}<br>
+                {_esc(shipping.get('address', ''))}<br>
+                {_esc(shipping.get('city', ''))}, {_esc(shipping.get('state', ''))}<br>
+                {_esc(shipping.get('pincode', ''))}
             </p>
             
             <div style="text-align: center; margin-top: 30px;">
@@ -163,20 +227,21 @@ class EmailTemplates:
         order = data.get('order', {})
         customer = data.get('customer', {})
         tracking = data.get('tracking', {})
+        tracking_number = tracking.get('number', 'N/A')
         
         content = f"""
             <h1>📦 Your Order is On Its Way!</h1>
-            <p>Hi {html.escape(customer.get('name', 'there'))},</p>
+            <p>Hi {_esc(customer.get('name', 'there'))},</p>
             <p>Great news! Your order has been shipped and is on its way to you.</p>
             
             <div class="highlight">
-                <strong>Tracking Number:</strong> {html.escape(tracking.get('number', 'N/A'))}<br>
-                <strong>Carrier:</strong> {html.escape(tracking.get('carrier', 'Standard Shipping'))}<br>
-                <strong>Expected Delivery:</strong> {html.escape(tracking.get('expectedDate', '3-5 business days'))}
+                <strong>Tracking Number:</strong> {_esc(tracking_number)}<br>
+                <strong>Carrier:</strong> {_esc(tracking.get('carrier', 'Standard Shipping'))}<br>
+                <strong>Expected Delivery:</strong> {_esc(tracking.get('expectedDate', '3-5 business days'))}
             </div>
             
             <div style="text-align: center; margin-top: 30px;">
-                <a href="{html.escape(tracking.get('url', '#'))}" class="btn">Track Package</a>
+                <a href="{_esc(tracking.get('url', '#'))}" class="btn">Track Package</a>
             </div>
             
             <p style="margin-top: 30px; font-size: 14px; color: #666;">
@@ -187,7 +252,7 @@ class EmailTemplates:
         return {
             "subject": "Your BLACKONN Order Has Shipped! 📦",
             "html": self._base_template(content, "Your order is on its way!"),
-            "text": f"Your order has shipped! Tracking: {tracking.get('number', 'N/A')}"
+            "text": f"Your order has shipped! Tracking: {tracking_number}"
         }
     
     def welcome_email(self, data):
@@ -197,12 +262,12 @@ class EmailTemplates:
         
         content = f"""
             <h1>Welcome to BLACKONN! 🖤</h1>
-            <p>Hi {html.escape(customer.get('name', 'there'))},</p>
+            <p>Hi {_esc(customer.get('name', 'there'))},</p>
             <p>Welcome to the BLACKONN family! We're thrilled to have you join our community of style-conscious individuals who appreciate premium black clothing.</p>
             
             <div class="highlight" style="text-align: center;">
                 <p style="margin: 0; font-size: 14px;">Here's a special welcome gift for you:</p>
-                <p style="font-size: 32px; font-weight: bold; margin: 15px 0; letter-spacing: 3px;">{html.escape(promo_code)}</p>
+                <p style="font-size: 32px; font-weight: bold; margin: 15px 0; letter-spacing: 3px;">{_esc(promo_code)}</p>
                 <p style="margin: 0; font-size: 14px;">Use this code for <strong>10% OFF</strong> your first order!</p>
             </div>
             
@@ -235,16 +300,16 @@ class EmailTemplates:
             <p>We received a request to reset your password. Click the button below to create a new password:</p>
             
             <div style="text-align: center; margin: 30px 0;">
-                <a href="{html.escape(reset_link)}" class="btn">Reset Password</a>
+                <a href="{_esc(reset_link)}" class="btn">Reset Password</a>
             </div>
             
             <p style="font-size: 14px; color: #666;">
-                This link will expire in {html.escape(expires)}. If you didn't request this, you can safely ignore this email.
+                This link will expire in {_esc(expires)}. If you didn't request this, you can safely ignore this email.
             </p>
             
             <p style="font-size: 13px; color: #999; margin-top: 30px;">
                 If the button doesn't work, copy and paste this link into your browser:<br>
-                <span style="word-break: break-all;">{html.escape(reset_link)}</span>
+                <span style="word-break: break-all;">{_esc(reset_link)}</span>
             </p>
         """
         
@@ -261,20 +326,17 @@ class EmailTemplates:
         cart_total = data.get('total', 0)
         discount = data.get('discount', 'COMEBACK10')
         
-        items_html = ""
-        for item in items[:3]:  # Show max 3 items
-            items_html += f"""
-            <div style="display: flex; align-items: center; padding: 15px 0; border-bottom: 1px solid #eee;">
-                <div style="flex: 1;">
-                    <strong>{html.escape(str(item.get('name', 'Product')))}</strong><br>
-                    <span style="color: #666;">₹{item.get('price', 0):,.2f}</span>
-                </div>
-            </div>
-            """
+        items_html = "".join(
+            _CART_ITEM_ROW.format(
+                name=_esc(str(item.get('name', 'Product'))),
+                price=item.get('price', 0),
+            )
+            for item in items[:3]  # Show max 3 items
+        )
         
         content = f"""
             <h1>You Left Something Behind! 🛒</h1>
-            <p>Hi {html.escape(customer.get('name', 'there'))},</p>
+            <p>Hi {_esc(customer.get('name', 'there'))},</p>
             <p>We noticed you left some amazing items in your cart. Don't worry, we saved them for you!</p>
             
             <div style="background: #f8f8f8; padding: 20px; border-radius: 8px; margin: 20px 0;">
@@ -286,7 +348,7 @@ class EmailTemplates:
             
             <div class="highlight" style="text-align: center; background: #fef3c7;">
                 <p style="margin: 0; font-size: 14px;">Here's a little incentive to complete your order:</p>
-                <p style="font-size: 24px; font-weight: bold; margin: 10px 0; color: #0b0b0b;">{html.escape(discount)}</p>
+                <p style="font-size: 24px; font-weight: bold; margin: 10px 0; color: #0b0b0b;">{_esc(discount)}</p>
                 <p style="margin: 0; font-size: 14px;">Get <strong>10% OFF</strong> when you complete your purchase!</p>
             </div>
             
@@ -309,7 +371,7 @@ class EmailTemplates:
         
         content = f"""
             <h1>How Did We Do? ⭐</h1>
-            <p>Hi {html.escape(customer.get('name', 'there'))},</p>
+            <p>Hi {_esc(customer.get('name', 'there'))},</p>
             <p>We hope you're loving your recent BLACKONN purchase! Your feedback helps us improve and helps other customers make great choices.</p>
             
             <div style="text-align: center; margin: 30px 0;">
@@ -333,26 +395,27 @@ class EmailTemplates:
         }
 
 
+_TEMPLATES = EmailTemplates()
+
+# One entry per email kind; generate_email accepts '-' for '_' in any of these
+_GENERATORS = {
+    'welcome': _TEMPLATES.welcome_email,
+    'order_confirmation': _TEMPLATES.order_confirmation,
+    'shipping': _TEMPLATES.shipping_notification,
+    'shipped': _TEMPLATES.shipping_notification,
+    'password_reset': _TEMPLATES.password_reset,
+    'abandoned_cart': _TEMPLATES.abandoned_cart,
+    'review': _TEMPLATES.review_request,
+    'review_request': _TEMPLATES.review_request
+}
+
+
 def generate_email(data):
     """Generate email template based on type"""
-    templates = EmailTemplates()
     email_type = data.get('type', 'welcome')
     
-    template_map = {
-        'welcome': templates.welcome_email,
-        'order_confirmation': templates.order_confirmation,
-        'order-confirmation': templates.order_confirmation,
-        'shipping': templates.shipping_notification,
-        'shipped': templates.shipping_notification,
-        'password_reset': templates.password_reset,
-        'password-reset': templates.password_reset,
-        'abandoned_cart': templates.abandoned_cart,
-        'abandoned-cart': templates.abandoned_cart,
-        'review': templates.review_request,
-        'review_request': templates.review_request
-    }
-    
-    generator = template_map.get(email_type)
+    key = email_type.replace('-', '_') if isinstance(email_type, str) else email_type
+    generator = _GENERATORS.get(key)
     
     if generator:
         return generator(data)
@@ -371,29 +434,29 @@ if __name__ == "__main__":
             input_data = {}
             if len(sys.argv) > 2:
                 if sys.argv[2] == "--stdin":
-                    input_data = json.loads(sys.stdin.read())
+                    input_data = _loads(sys.stdin.buffer.read())
                 else:
-                    input_data = json.loads(sys.argv[2])
+                    input_data = _loads(sys.argv[2])
             
             if not isinstance(input_data, dict):
                 input_data = {"data": input_data}
             
             if task == "generate":
-                print(json.dumps(generate_email(input_data)))
+                _emit(generate_email(input_data))
             elif task == "types":
-                print(json.dumps({
+                _emit({
                     "available_types": [
                         "welcome", "order_confirmation", "shipping", 
                         "password_reset", "abandoned_cart", "review_request"
                     ]
-                }))
+                })
             elif task == "status" or task == "health":
-                print(json.dumps({"status": "healthy", "version": "1.0.0"}))
+                _emit({"status": "healthy", "version": "1.0.0"})
             else:
                 # Assume task is the email type
                 input_data['type'] = task
-                print(json.dumps(generate_email(input_data)))
+                _emit(generate_email(input_data))
         except Exception as e:
-            print(json.dumps({"error": str(e)}))
+            _emit({"error": str(e)})
     else:
-        print(json.dumps({"status": "healthy", "engine": "Email Templates v1.0"}))
+        _emit({"status": "healthy", "engine": "Email Templates v1.0"})
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.absolute()))
+
+from blackonn_agent import BlackonnAgent, Fix
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is required to verify JS fixes")
+def test_apply_fix_verifies_js(tmp_path):
+    js_file = tmp_path / "app.js"
+    js_file.write_text("const a = 1\nconsole.log(a)\n")
+    fix = Fix(
+        id="fix_test", error_id="err_test", file_path=str(js_file),
+        original="const a = 1\n", fixed="const a = 1;\n",
+        explanation="Add missing semicolon", confidence=0.9, pattern_used="test",
+    )
+    agent = BlackonnAgent()
+    try:
+        assert agent._apply_fix(fix)
+    finally:
+        agent._close_node_worker()
+    assert fix.applied and fix.verified
+    assert js_file.read_text() == "const a = 1;\nconsole.log(a)\n"
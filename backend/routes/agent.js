@@ -25,7 +25,8 @@ let agentStatus = {
 // Paths
 const AGENT_SCRIPT = path.join(__dirname, '..', 'ml', 'blackonn_agent.py');
 const AGENT_DATA_DIR = path.join(__dirname, '..', 'ml', 'agent_data');
-const FIX_HISTORY_FILE = path.join(AGENT_DATA_DIR, 'fix_history.json');
+const FIX_HISTORY_FILE = path.join(AGENT_DATA_DIR, 'fix_history.jsonl');
+const LEGACY_FIX_HISTORY_FILE = path.join(AGENT_DATA_DIR, 'fix_history.json');
 
 // Ensure agent data directory exists
 if (!fs.existsSync(AGENT_DATA_DIR)) {
@@ -319,6 +320,32 @@ router.post('/analyze', async (req, res) => {
     }
 });
 
+/**
+ * Helper: Read fix history (legacy JSON array, then JSONL entries), oldest first
+ */
+function readFixHistory() {
+    let history = [];
+    if (fs.existsSync(LEGACY_FIX_HISTORY_FILE)) {
+        try {
+            const legacy = JSON.parse(fs.readFileSync(LEGACY_FIX_HISTORY_FILE, 'utf8').replace(/^\uFEFF/, ''));
+            if (Array.isArray(legacy)) history = legacy;
+        } catch (e) {
+            // Ignore unreadable legacy history
+        }
+    }
+    if (fs.existsSync(FIX_HISTORY_FILE)) {
+        for (const line of fs.readFileSync(FIX_HISTORY_FILE, 'utf8').split('\n')) {
+            if (!line.trim()) continue;
+            try {
+                history.push(JSON.parse(line));
+            } catch (e) {
+                // Skip a partially written line
+            }
+        }
+    }
+    return history;
+}
+
 /**
  * @route   GET /api/agent/history
  * @desc    Get fix history
@@ -326,10 +353,7 @@ router.post('/analyze', async (req, res) => {
  */
 router.get('/history', (req, res) => {
     try {
-        let history = [];
-        if (fs.existsSync(FIX_HISTORY_FILE)) {
-            history = JSON.parse(fs.readFileSync(FIX_HISTORY_FILE, 'utf8'));
-        }
+        const history = readFixHistory();
 
         res.json({
             success: true,
@@ -352,7 +376,10 @@ router.get('/history', (req, res) => {
 router.delete('/history', (req, res) => {
     try {
         if (fs.existsSync(FIX_HISTORY_FILE)) {
-            fs.writeFileSync(FIX_HISTORY_FILE, '[]');
+            fs.writeFileSync(FIX_HISTORY_FILE, '');
+        }
+        if (fs.existsSync(LEGACY_FIX_HISTORY_FILE)) {
+            fs.writeFileSync(LEGACY_FIX_HISTORY_FILE, '[]');
         }
         res.json({ success: true, message: 'History cleared' });
     } catch (error) {
@@ -1276,6 +1276,15 @@ app.use((err, req, res, next) => {
         logger.error('󰚩 Error initializing AI:', err.message);
       });
 
+    // Compile the numba kernels once so the first analytics request doesn't pay for it
+    pythonBridge.warmAIHub()
+      .then(report => {
+        logger.info('󰚩 AI JIT kernels warmed');
+      })
+      .catch(err => {
+        logger.warn('󰚩 AI JIT warm-up skipped:', err.message);
+      });
+
     // Memory watchdog: if RSS memory goes above MEMORY_LIMIT_MB (Default 1.5GB), gracefully restart
     const MEMORY_LIMIT_MB = process.env.MEMORY_LIMIT_MB ? parseInt(process.env.MEMORY_LIMIT_MB, 10) : 1536;
     setInterval(() => {
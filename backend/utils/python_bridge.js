@@ -69,6 +69,8 @@ const runPythonScript = (scriptName, args = [], timeout = 30000) => {
     let stdout = '';
     let stderr = '';
     
+    // Decode as a stream so multi-byte UTF-8 characters split across chunks stay intact
+    pyProcess.stdout.setEncoding('utf8');
     pyProcess.stdout.on('data', (data) => {
       stdout += data.toString();
     });
@@ -123,6 +125,13 @@ const getAIHealth = async () => {
   return runPythonScript('ai_hub.py', ['health']);
 };
 
+/**
+ * Compile (or load from cache) the ML engines' numba kernels; call once at start-up
+ */
+const warmAIHub = async () => {
+  return runPythonScript('ai_hub.py', ['warm']);
+};
+
 /**
  * Get all AI capabilities
  */
@@ -354,6 +363,7 @@ module.exports = {
   runPythonScript,
   runAIHub,
   getAIHealth,
+  warmAIHub,
   getAICapabilities,
   analytics,
   fraud,